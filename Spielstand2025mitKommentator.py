@@ -1,6 +1,10 @@
 import streamlit as st
 import pyrebase
 import pandas as pd
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 st.set_page_config(page_title="Vatertagsspiele 2025 – Live", layout="wide")
 
@@ -13,22 +17,172 @@ firebase_config = {
 }
 
 firebase = pyrebase.initialize_app(firebase_config)
-db = firebase.database()
 
-# Daten abrufen
 spiel_id = "vatertag2025"
-spiel = db.child("spiele").child(spiel_id).get().val()
-spieler = db.child("spieler").order_by_child("spiel_id").equal_to(spiel_id).get().val()
-runden = db.child("runden").order_by_child("spiel_id").equal_to(spiel_id).get().val()
-multiplikatoren = db.child("multiplikatoren").child(spiel_id).get().val()
-
-# Sicherstellen, dass Session-State gesetzt ist
-if "spieler" not in st.session_state:
-    st.session_state.spieler = list(spieler.values()) if spieler else []
-if "runden" not in st.session_state:
-    st.session_state.runden = list(runden.values()) if runden else []
-if "multiplikatoren" not in st.session_state:
-    st.session_state.multiplikatoren = multiplikatoren if multiplikatoren else {}
+
+# Einzelne Knoten dieses Spiels
+PFADE = {
+    "spiel": f"spiele/{spiel_id}",
+    "multiplikatoren": f"multiplikatoren/{spiel_id}",
+}
+
+# Spieler und Runden liegen in gemeinsamen Sammlungen mit "spiel_id"-Feld (braucht ".indexOn": ["spiel_id"]
+# in den Regeln) – gelesen und gestreamt wird nur die Abfrage auf dieses Spiel, nie die ganze Sammlung
+SAMMLUNGEN = {"spieler": "spieler", "runden": "runden"}
+
+# So oft (Sekunden) prüft der Wächter, ob ein Stream abgerissen ist
+STREAM_PRUEFUNG_S = 10
+
+
+def _knoten(pfad):
+    # Eigene Database-Instanz pro Aufruf: pyrebase merkt sich den Pfad im Objekt (nicht threadsicher)
+    knoten = firebase.database()
+    for teil in pfad.split("/"):
+        knoten = knoten.child(teil)
+    return knoten
+
+
+def _als_dict(wert):
+    """RTDB liefert dichte Schlüssel als Liste – intern immer als Dict führen."""
+    if isinstance(wert, dict):
+        return wert
+    if isinstance(wert, list):
+        return {str(i): v for i, v in enumerate(wert) if v is not None}
+    return {}
+
+
+def _setze(baum, pfad, wert):
+    """Setzt (oder löscht bei None) einen Wert im Baum, ändert nur den betroffenen Ast."""
+    if not pfad:
+        return wert
+    baum = _als_dict(baum)
+    knoten = baum
+    for teil in pfad[:-1]:
+        kind = _als_dict(knoten.get(teil))
+        knoten[teil] = kind
+        knoten = kind
+    if wert is None:
+        knoten.pop(pfad[-1], None)
+    else:
+        knoten[pfad[-1]] = wert
+    return baum
+
+
+def _quelle(schluessel):
+    """Knoten bzw. Abfrage, die für einen Schlüssel gelesen und gestreamt wird."""
+    if schluessel in SAMMLUNGEN:
+        return firebase.database().child(SAMMLUNGEN[schluessel]).order_by_child("spiel_id").equal_to(spiel_id)
+    return _knoten(PFADE[schluessel])
+
+
+def lade_parallel():
+    """
+    Lädt alle Quellen gleichzeitig – Ladezeit ist das Maximum statt der Summe der Aufrufe.
+
+    Returns:
+        dict: Daten pro Schlüssel
+    """
+    schluessel_liste = list(PFADE) + list(SAMMLUNGEN)
+    with ThreadPoolExecutor(max_workers=len(schluessel_liste)) as pool:
+        auftraege = {s: pool.submit(lambda s: _quelle(s).get().val(), s) for s in schluessel_liste}
+        return {s: auftrag.result() for s, auftrag in auftraege.items()}
+
+
+class LiveModell:
+    """Hält die Spieldaten im Speicher und wendet Stream-Events inkrementell an."""
+
+    def __init__(self, daten):
+        self.lock = threading.Lock()
+        self.daten = daten
+        self.version = 0
+        self.streams = {}
+        self._neu_starten = set()
+
+    def anwenden(self, schluessel, nachricht):
+        pfad = [teil for teil in (nachricht.get("path") or "/").split("/") if teil]
+        with self.lock:
+            if nachricht["event"] == "put":
+                self.daten[schluessel] = _setze(self.daten.get(schluessel), pfad, nachricht["data"])
+            elif nachricht["event"] == "patch":
+                for unterpfad, wert in (nachricht["data"] or {}).items():
+                    teile = [teil for teil in unterpfad.split("/") if teil]
+                    self.daten[schluessel] = _setze(self.daten.get(schluessel), pfad + teile, wert)
+            elif nachricht["event"] in ("cancel", "auth_revoked"):
+                # Server hat den Stream beendet – der Wächter startet ihn neu
+                self._neu_starten.add(schluessel)
+                return
+            else:
+                return
+            self.version += 1
+
+    def _behandle(self, schluessel, nachricht):
+        if not nachricht:
+            return  # keep-alive
+        try:
+            self.anwenden(schluessel, nachricht)
+        except Exception:
+            # Unlesbares Event: nicht den Stream-Thread sterben lassen, sondern neu synchronisieren
+            with self.lock:
+                self._neu_starten.add(schluessel)
+
+    def starte_stream(self, schluessel):
+        """(Neu-)Start eines Streams. Der erste Event ist ein "put" mit dem vollen Stand – verpasste Änderungen holt er nach."""
+        alt = self.streams.pop(schluessel, None)
+        if alt is not None:
+            # close() wartet auf den Stream-Thread – nicht den Wächter blockieren
+            threading.Thread(target=alt.close, daemon=True).start()
+        self.streams[schluessel] = _quelle(schluessel).stream(lambda nachricht: self._behandle(schluessel, nachricht))
+
+    def ueberwache(self):
+        """Wächter-Thread: startet beendete oder abgerissene Streams neu, bei Netzfehlern im nächsten Durchlauf erneut."""
+        while True:
+            time.sleep(STREAM_PRUEFUNG_S)
+            with self.lock:
+                neu_starten, self._neu_starten = self._neu_starten, set()
+            for schluessel, stream in list(self.streams.items()):
+                if schluessel in neu_starten or not stream.thread.is_alive():
+                    try:
+                        self.starte_stream(schluessel)
+                    except Exception:
+                        with self.lock:
+                            self._neu_starten.add(schluessel)
+
+    def momentaufnahme(self):
+        with self.lock:
+            return self.version, copy.deepcopy(self.daten)
+
+
+@st.cache_resource
+def starte_live_modell():
+    """Einmal pro Prozess: parallel laden, Stream-Listener pro Quelle und einen Wächter starten."""
+    modell = LiveModell(lade_parallel())
+    for schluessel in modell.daten:
+        modell.starte_stream(schluessel)
+    threading.Thread(target=modell.ueberwache, daemon=True).start()
+    return modell
+
+
+def _werte(baum):
+    return list(_als_dict(baum).values())
+
+
+modell = starte_live_modell()
+version, daten = modell.momentaufnahme()
+st.session_state.modell_version = version
+
+spiel = daten["spiel"]
+st.session_state.spieler = [sp for sp in _werte(daten["spieler"]) if sp.get("spiel_id", spiel_id) == spiel_id]
+st.session_state.runden = [r for r in _werte(daten["runden"]) if r.get("spiel_id", spiel_id) == spiel_id]
+st.session_state.multiplikatoren = _als_dict(daten["multiplikatoren"])
+
+
+# 🔄 Neu zeichnen, sobald der Stream etwas geändert hat (prüft nur den Speicher, kein Netzwerk)
+@st.fragment(run_every=2)
+def beobachte_aenderungen():
+    if modell.version != st.session_state.modell_version:
+        st.rerun()
+
+beobachte_aenderungen()
 
 # Live Punkteverlauf und Gewinnanalyse vorbereiten
 punkteverlauf = []
@@ -0,0 +1,60 @@
+import random
+import time
+
+# Schnelles Intervall direkt nach einer Änderung
+SCHNELL_MS = 5_000
+# So lange nach der letzten Änderung wird schnell abgefragt, danach verdoppelt sich das Intervall je Fenster
+SCHNELL_FENSTER_S = 180
+# Obergrenze im Leerlauf (z. B. Grillpause)
+MAX_MS = 600_000
+# ± Anteil Zufall, damit nicht alle Bildschirme gleichzeitig Firestore abfragen
+JITTER = 0.15
+
+
+def naechstes_intervall(sekunden_seit_aenderung, override_ms=None, zufall=random.random):
+    """
+    Berechnet das nächste Refresh-Intervall aus der beobachteten Schreibaktivität.
+
+    Args:
+        sekunden_seit_aenderung: Zeit seit der letzten beobachteten Änderung des Spiels
+        override_ms: Vom Server vorgegebenes Intervall (hat Vorrang)
+        zufall: Zufallsquelle in [0, 1) für den Jitter
+
+    Returns:
+        int: Intervall in Millisekunden
+    """
+    if override_ms:
+        basis = override_ms
+    elif sekunden_seit_aenderung <= SCHNELL_FENSTER_S:
+        basis = SCHNELL_MS
+    else:
+        stufe = int((sekunden_seit_aenderung - SCHNELL_FENSTER_S) // SCHNELL_FENSTER_S) + 1
+        basis = min(SCHNELL_MS * 2 ** stufe, MAX_MS)
+    return int(basis * (1 + JITTER * (2 * zufall() - 1)))
+
+
+class Taktgeber:
+    """Merkt sich pro Sitzung, wann sich das Spiel zuletzt geändert hat."""
+
+    def __init__(self):
+        self.version = None
+        self.letzte_aenderung = time.time()
+
+    def beobachte(self, version):
+        """Neue Version gesehen → zurück in den schnellen Modus."""
+        if version != self.version:
+            self.version = version
+            self.letzte_aenderung = time.time()
+
+    def intervall(self, override_ms=None):
+        return naechstes_intervall(time.time() - self.letzte_aenderung, override_ms)
+
+
+def zeitfenster():
+    """Aktuelles Abfragefenster – als Cache-Argument begrenzt es Firestore-Lesezugriffe auf eins pro Fenster."""
+    return int(time.time() * 1000 // SCHNELL_MS)
+
+
+def spielversion(daten):
+    """Version eines Spieldokuments: Speicherzeitpunkt plus Rundenzahl."""
+    return f"{daten.get('zeitstempel')}|{len(daten.get('runden', []))}"
@@ -0,0 +1,97 @@
+import functools
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from messung import zaehle, setze
+
+# Gemeinsames Speicherbudget aller begrenzten Caches eines Prozesses
+MAX_BYTES = int(os.environ.get("VATERTAG_CACHE_MB", "64")) * 1024 * 1024
+
+_lock = threading.Lock()
+# (Funktionsname, Schlüssel) → (pickle-Bytes, Ablaufzeit); Reihenfolge = LRU, ältester vorne
+_eintraege = OrderedDict()
+_bytes = {}
+_anzahl = {}
+
+
+def _melde(name):
+    """Speicherstand als Momentanwerte für Diagnose und Prometheus."""
+    setze(f"cache.{name}.bytes", _bytes.get(name, 0))
+    setze(f"cache.{name}.eintraege", _anzahl.get(name, 0))
+    setze("cache.gesamt_bytes", sum(_bytes.values()))
+
+
+def _entferne(schluessel):
+    wert, _ = _eintraege.pop(schluessel)
+    name = schluessel[0]
+    _bytes[name] -= len(wert)
+    _anzahl[name] -= 1
+    return name
+
+
+def _raeume_auf(name, max_eintraege):
+    """Verdrängt die am längsten ungenutzten Einträge (pro Funktion und global nach Bytes)."""
+    betroffen = {name}
+    if _anzahl.get(name, 0) > max_eintraege:
+        aeltester = next(s for s in _eintraege if s[0] == name)
+        _entferne(aeltester)
+    while _eintraege and sum(_bytes.values()) > MAX_BYTES:
+        betroffen.add(_entferne(next(iter(_eintraege))))
+    for betroffener in betroffen:
+        _melde(betroffener)
+
+
+def begrenzt(max_eintraege, ttl=None):
+    """
+    Decorator: speicherbegrenzter Ersatz für st.cache_data.
+
+    Ergebnisse werden gepickelt abgelegt (wie bei st.cache_data bekommt jeder
+    Aufrufer eine eigene Kopie), die Größe zählt gegen MAX_BYTES. Zu viele
+    Einträge einer Funktion oder zu viele Bytes insgesamt verdrängen die am
+    längsten ungenutzten Einträge. Aufrufe und Misses landen unter
+    cache.{name}.aufrufe / cache.{name}.misses.
+
+    Args:
+        max_eintraege: Höchstzahl gleichzeitig gehaltener Argument-Kombinationen
+        ttl: Lebensdauer eines Eintrags in Sekunden (None = unbegrenzt)
+    """
+    def decorator(funktion):
+        name = funktion.__name__
+
+        @functools.wraps(funktion)
+        def wrapper(*args, **kwargs):
+            zaehle(f"cache.{name}.aufrufe")
+            inhalt = pickle.dumps((args, sorted(kwargs.items())))
+            schluessel = (name, hashlib.sha1(inhalt).hexdigest())
+
+            with _lock:
+                eintrag = _eintraege.get(schluessel)
+                if eintrag is not None:
+                    if eintrag[1] is None or eintrag[1] > time.monotonic():
+                        _eintraege.move_to_end(schluessel)
+                        return pickle.loads(eintrag[0])
+                    _entferne(schluessel)
+
+            zaehle(f"cache.{name}.misses")
+            ergebnis = funktion(*args, **kwargs)
+            try:
+                wert = pickle.dumps(ergebnis)
+            except Exception:
+                return ergebnis  # Nicht picklebar – dann eben ungecacht
+
+            with _lock:
+                if schluessel in _eintraege:
+                    _entferne(schluessel)  # Parallel berechnet – durch den frischeren Wert ersetzen
+                _eintraege[schluessel] = (wert, time.monotonic() + ttl if ttl else None)
+                _bytes[name] = _bytes.get(name, 0) + len(wert)
+                _anzahl[name] = _anzahl.get(name, 0) + 1
+                _raeume_auf(name, max_eintraege)
+            return ergebnis
+
+        return wrapper
+    return decorator
+
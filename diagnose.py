@@ -0,0 +1,93 @@
+import os
+
+import pandas as pd
+import streamlit as st
+
+from messung import auswertung, zaehlerstaende, starte_metrik_server, starte_profil, profil_bericht
+
+# Laufendes cProfile der Sitzung (pro Rerun höchstens eins)
+PROFIL_SCHLUESSEL = "_diagnose_profil"
+
+
+def diagnose_aktiv():
+    """Versteckte Diagnoseseite: nur mit ?diagnose=1 in der URL sichtbar."""
+    return st.query_params.get("diagnose") == "1"
+
+
+def starte_diagnose():
+    """
+    Am Anfang jedes Reruns aufrufen: startet bei Bedarf den Metrik-Server
+    (Umgebungsvariablen VATERTAG_METRIK_PORT, VATERTAG_METRIK_HOST – Standard
+    127.0.0.1) und mit ?profil=1 ein cProfile.
+
+    Returns:
+        cProfile.Profile oder None
+    """
+    port = os.environ.get("VATERTAG_METRIK_PORT")
+    if port:
+        starte_metrik_server(int(port), os.environ.get("VATERTAG_METRIK_HOST", "127.0.0.1"))
+
+    # Endete der letzte Rerun vor zeige_diagnose() (Fehler, st.stop()/st.rerun()), läuft sein Profil noch
+    _beende_profil()
+    if st.query_params.get("profil") != "1":
+        return None
+    profiler = starte_profil()
+    st.session_state[PROFIL_SCHLUESSEL] = profiler
+    return profiler
+
+
+def _beende_profil():
+    profiler = st.session_state.pop(PROFIL_SCHLUESSEL, None)
+    if profiler is not None:
+        profiler.disable()
+
+
+def stoppe():
+    """Ersatz für st.stop(): beendet vorher das cProfile dieses Reruns."""
+    _beende_profil()
+    st.stop()
+
+
+def starte_neu():
+    """Ersatz für st.rerun(): beendet vorher das cProfile dieses Reruns."""
+    _beende_profil()
+    st.rerun()
+
+
+def zeige_diagnose(profiler=None):
+    """Zeigt p50/p95 pro Stufe, Zähler und optional das cProfile des Reruns."""
+    _beende_profil()
+    bericht = profil_bericht(profiler) if profiler else None
+    if not diagnose_aktiv():
+        return
+
+    st.subheader("🩺 Diagnose")
+    stufen = auswertung()
+    if stufen:
+        df = pd.DataFrame(stufen).round({"p50_ms": 2, "p95_ms": 2, "max_ms": 2})
+        st.dataframe(df, use_container_width=True, hide_index=True)
+
+    zaehler, werte = zaehlerstaende()
+
+    # Cache-Trefferquoten aus den Aufruf-/Miss-Zählern ableiten, Speicher aus den Momentanwerten
+    caches = sorted({name.split(".")[1] for name in zaehler if name.startswith("cache.")})
+    if caches:
+        st.dataframe(pd.DataFrame([
+            {
+                "Cache": name,
+                "Aufrufe": zaehler.get(f"cache.{name}.aufrufe", 0),
+                "Misses": zaehler.get(f"cache.{name}.misses", 0),
+                "Einträge": werte.get(f"cache.{name}.eintraege", 0),
+                "KB": round(werte.get(f"cache.{name}.bytes", 0) / 1024, 1),
+            }
+            for name in caches
+        ]).assign(Trefferquote=lambda d: (1 - d["Misses"] / d["Aufrufe"].clip(lower=1)).round(3)),
+            use_container_width=True, hide_index=True)
+        st.caption(f"Cache-Speicher gesamt: {werte.get('cache.gesamt_bytes', 0) / 1024 / 1024:.1f} MB")
+
+    sonstige = {name: wert for name, wert in werte.items() if not name.startswith("cache.")}
+    if sonstige:
+        st.json(sonstige)
+
+    if bericht:
+        st.text(bericht)
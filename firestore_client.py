@@ -0,0 +1,58 @@
+import json
+import os
+import threading
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+from google.api_core.retry import Retry, if_transient_error
+
+# Zeitlimit pro Firestore-Aufruf in Sekunden
+TIMEOUT_SEKUNDEN = float(os.environ.get("VATERTAG_FIRESTORE_TIMEOUT", "10"))
+
+# Lesezugriffe bei vorübergehenden Fehlern (UNAVAILABLE, Timeout …) mit Back-off wiederholen
+LESE_RETRY = Retry(predicate=if_transient_error, initial=0.2, maximum=2.0, multiplier=2.0, timeout=TIMEOUT_SEKUNDEN * 2)
+
+# Als **kwargs an get()/stream()/get_all() bzw. set()/update()/delete() übergeben.
+# Schreibzugriffe ohne Retry (retry=None schaltet auch den Standard-Retry des Clients ab):
+# bei Vorbedingungen (update_time) wäre eine Wiederholung nicht eindeutig.
+LESEN = {"timeout": TIMEOUT_SEKUNDEN, "retry": LESE_RETRY}
+SCHREIBEN = {"timeout": TIMEOUT_SEKUNDEN, "retry": None}
+
+_lock = threading.Lock()
+_client = None
+
+
+def _aufwaermen(client):
+    """Baut Kanal und Auth-Token vorab auf, damit der erste echte Aufruf nicht darauf wartet."""
+    try:
+        client.collection("spiele").document("_aufwaermen").get(**LESEN)
+    except Exception:
+        pass  # Nur Optimierung – Fehler zeigen sich beim ersten echten Aufruf
+
+
+def get_firestore_client(service_account=None):
+    """
+    Liefert den prozessweit geteilten Firestore-Client (ein gRPC-Kanal für alle Sitzungen).
+    Die Firestore-Bibliothek setzt auf diesem Kanal bereits Keep-Alive (30 s).
+
+    Args:
+        service_account: Pfad zur Service-Account-Datei (CLI); ohne Angabe aus st.secrets
+
+    Returns:
+        google.cloud.firestore.Client
+    """
+    global _client
+    if _client is not None:
+        return _client
+
+    with _lock:
+        if _client is None:
+            if not firebase_admin._apps:
+                if service_account is None:
+                    import streamlit as st
+
+                    service_account = json.loads(st.secrets["firebase_service_account"])
+                firebase_admin.initialize_app(credentials.Certificate(service_account))
+            _client = firestore.client()
+            threading.Thread(target=_aufwaermen, args=(_client,), daemon=True).start()
+    return _client
@@ -0,0 +1,185 @@
+import functools
+import hashlib
+import importlib
+import os
+import pickle
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+
+# Backend: "redis://…" für mehrere Rechner, sonst SQLite-Datei (gemeinsam für alle Replikas auf einem Rechner)
+CACHE_URL = os.environ.get("VATERTAG_CACHE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "vatertag_cache.sqlite3"))
+# Wie lange eine Berechnungssperre höchstens gilt (falls die Replika abstürzt)
+SPERRDAUER = 30
+# Wie lange andere Replikas auf das Ergebnis der sperrenden Replika warten
+WARTEZEIT = 10
+WARTE_INTERVALL = 0.05
+
+
+class SQLiteSpeicher:
+    """Gemeinsamer Cache in einer SQLite-Datei (lokaler Ersatz für Redis)."""
+
+    def __init__(self, pfad):
+        self.pfad = pfad
+        with self._verbindung() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("CREATE TABLE IF NOT EXISTS eintraege (schluessel TEXT PRIMARY KEY, wert BLOB, ablauf REAL)")
+            con.execute("CREATE TABLE IF NOT EXISTS sperren (schluessel TEXT PRIMARY KEY, ablauf REAL)")
+
+    def _verbindung(self):
+        # Eine Verbindung pro Aufruf: sqlite3-Verbindungen dürfen nicht zwischen Threads wandern
+        return closing(sqlite3.connect(self.pfad, timeout=5, isolation_level=None))
+
+    def hole(self, schluessel):
+        with self._verbindung() as con:
+            zeile = con.execute(
+                "SELECT wert FROM eintraege WHERE schluessel = ? AND ablauf > ?", (schluessel, time.time())
+            ).fetchone()
+        return zeile[0] if zeile else None
+
+    def setze(self, schluessel, wert, ttl):
+        with self._verbindung() as con:
+            con.execute("DELETE FROM eintraege WHERE ablauf <= ?", (time.time(),))
+            con.execute("INSERT OR REPLACE INTO eintraege VALUES (?, ?, ?)", (schluessel, wert, time.time() + ttl))
+
+    def sperre(self, schluessel, dauer):
+        with self._verbindung() as con:
+            con.execute("DELETE FROM sperren WHERE schluessel = ? AND ablauf <= ?", (schluessel, time.time()))
+            cursor = con.execute("INSERT OR IGNORE INTO sperren VALUES (?, ?)", (schluessel, time.time() + dauer))
+            return cursor.rowcount == 1
+
+    def freigeben(self, schluessel):
+        with self._verbindung() as con:
+            con.execute("DELETE FROM sperren WHERE schluessel = ?", (schluessel,))
+
+
+class RedisSpeicher:
+    """Gemeinsamer Cache in Redis (oder einem kompatiblen Server)."""
+
+    def __init__(self, url):
+        import redis
+
+        self.redis = redis.Redis.from_url(url)
+
+    def hole(self, schluessel):
+        return self.redis.get(schluessel)
+
+    def setze(self, schluessel, wert, ttl):
+        self.redis.set(schluessel, wert, ex=int(ttl))
+
+    def sperre(self, schluessel, dauer):
+        return bool(self.redis.set(f"sperre:{schluessel}", 1, nx=True, ex=dauer))
+
+    def freigeben(self, schluessel):
+        self.redis.delete(f"sperre:{schluessel}")
+
+
+_speicher = None
+
+
+def speicher():
+    """Backend einmal pro Prozess anlegen."""
+    global _speicher
+    if _speicher is None:
+        if CACHE_URL.startswith("redis"):
+            _speicher = RedisSpeicher(CACHE_URL)
+        else:
+            _speicher = SQLiteSpeicher(CACHE_URL.removeprefix("sqlite:///"))
+    return _speicher
+
+
+def hole_oder_berechne(schluessel, berechne, ttl):
+    """
+    Liefert den gemeinsamen Wert oder berechnet ihn – mit Single-Flight:
+    nur die Replika mit der Sperre rechnet, die anderen warten auf ihr Ergebnis.
+    Ist das Backend nicht erreichbar, wird einfach lokal gerechnet.
+    """
+    try:
+        s = speicher()
+        wert = s.hole(schluessel)
+        if wert is not None:
+            return pickle.loads(wert)
+
+        gesperrt = s.sperre(schluessel, SPERRDAUER)
+        if not gesperrt:
+            ende = time.monotonic() + WARTEZEIT
+            while time.monotonic() < ende:
+                time.sleep(WARTE_INTERVALL)
+                wert = s.hole(schluessel)
+                if wert is not None:
+                    return pickle.loads(wert)
+    except Exception:
+        return berechne()
+
+    if not gesperrt:
+        # Sperrende Replika hängt – selbst rechnen
+        return berechne()
+
+    try:
+        ergebnis = berechne()
+        try:
+            s.setze(schluessel, pickle.dumps(ergebnis), ttl)
+        except Exception:
+            pass  # Teilen ist optional, das Ergebnis gilt trotzdem
+        return ergebnis
+    finally:
+        try:
+            s.freigeben(schluessel)
+        except Exception:
+            pass  # Sperre läuft nach SPERRDAUER ohnehin ab
+
+
+def _code_version(code):
+    """Stabiler Hash des Bytecodes samt Konstanten (auch verschachtelter Funktionen)."""
+    h = hashlib.sha1(code.co_code)
+    h.update(repr(code.co_names).encode("utf-8"))
+    for konstante in code.co_consts:
+        if hasattr(konstante, "co_code"):
+            h.update(_code_version(konstante).encode("utf-8"))
+        elif isinstance(konstante, frozenset):
+            # Reihenfolge hängt sonst von PYTHONHASHSEED ab
+            h.update(repr(sorted(map(repr, konstante))).encode("utf-8"))
+        else:
+            h.update(repr(konstante).encode("utf-8"))
+    return h.hexdigest()[:12]
+
+
+def _datei_version(pfad):
+    """Hash einer Quelldatei; None, wenn sie nicht lesbar ist (dann zählt nur der Bytecode)."""
+    try:
+        with open(pfad, "rb") as datei:
+            return hashlib.sha1(datei.read()).hexdigest()[:12]
+    except OSError:
+        return None
+
+
+def geteilt(ttl, abhaengig_von=()):
+    """
+    Decorator: Ergebnis über alle Replikas teilen. Der Schlüssel besteht aus
+    Funktionsname, Code-Version und Hash der Argumente – also Spiel und
+    Datenstand (Version). Nach einem Deploy mit geändertem Code werden alte
+    Einträge (z. B. mit anderem Rückgabeformat) nicht mehr getroffen.
+
+    Die Code-Version umfasst den Bytecode der Funktion, ihre ganze Quelldatei
+    (Hilfsfunktionen daneben) und die Quelltexte der Module in abhaengig_von.
+
+    Args:
+        ttl: Lebensdauer eines geteilten Eintrags in Sekunden
+        abhaengig_von: Namen der Module, an die die Funktion die eigentliche Arbeit abgibt
+    """
+    def decorator(funktion):
+        h = hashlib.sha1(_code_version(funktion.__code__).encode("utf-8"))
+        pfade = [funktion.__code__.co_filename]
+        pfade += [importlib.import_module(name).__file__ for name in abhaengig_von]
+        for pfad in pfade:
+            h.update(str(_datei_version(pfad)).encode("utf-8"))
+        code_version = h.hexdigest()[:12]
+
+        @functools.wraps(funktion)
+        def wrapper(*args, **kwargs):
+            inhalt = pickle.dumps((args, sorted(kwargs.items())))
+            schluessel = f"{funktion.__name__}:{code_version}:{hashlib.sha1(inhalt).hexdigest()}"
+            return hole_oder_berechne(schluessel, lambda: funktion(*args, **kwargs), ttl)
+        return wrapper
+    return decorator
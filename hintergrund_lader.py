@@ -0,0 +1,88 @@
+import threading
+import time
+
+from messung import zaehle, messe
+
+
+class HintergrundLader:
+    """
+    Stale-while-revalidate: liefert sofort den letzten guten Stand und lädt ihn
+    im Hintergrund neu, sobald er älter als weich_ttl ist. Pro Schlüssel läuft
+    höchstens eine Aktualisierung (Single-Flight); schlägt sie fehl, bleibt der
+    alte Stand sichtbar und der Fehler wird gemeldet.
+
+    Die gelieferten Objekte werden von allen Sitzungen geteilt – nicht verändern!
+    """
+
+    def __init__(self, lade, weich_ttl):
+        """
+        Args:
+            lade: Funktion schluessel → Daten (darf Ausnahmen werfen)
+            weich_ttl: Ab diesem Alter in Sekunden wird im Hintergrund neu geladen
+        """
+        self.lade = lade
+        self.weich_ttl = weich_ttl
+        self._lock = threading.Lock()
+        self._erstladen = threading.Lock()
+        self._staende = {}
+        self._laufend = set()
+
+    def hole(self, schluessel):
+        """
+        Returns:
+            tuple: (Daten, Frische) – Frische enthält "alter_s", "fehler" (None oder Text)
+                   und "laedt" (True, solange eine Aktualisierung im Hintergrund läuft)
+        """
+        with self._lock:
+            stand = self._staende.get(schluessel)
+
+        if stand is None:
+            # Erster Aufruf: nichts zum Anzeigen – einmalig synchron laden, parallele Sitzungen warten darauf
+            with self._erstladen:
+                with self._lock:
+                    stand = self._staende.get(schluessel)
+                if stand is None:
+                    with messe("lader.synchron"):
+                        self._aktualisiere(schluessel, werfen=True)
+                    with self._lock:
+                        stand = self._staende[schluessel]
+
+        alter = time.monotonic() - stand["geladen"]
+        if alter > self.weich_ttl and time.monotonic() >= stand["naechster_versuch"]:
+            self._starte_hintergrund(schluessel)
+        return stand["daten"], {"alter_s": alter, "fehler": stand["fehler"], "laedt": self.laedt(schluessel)}
+
+    def _starte_hintergrund(self, schluessel):
+        with self._lock:
+            if schluessel in self._laufend:
+                return
+            self._laufend.add(schluessel)
+        threading.Thread(target=self._aktualisiere, args=(schluessel,), daemon=True).start()
+
+    def _aktualisiere(self, schluessel, werfen=False):
+        try:
+            with messe("lader.hintergrund"):
+                daten = self.lade(schluessel)
+        except Exception as fehler:
+            zaehle("lader.fehler")
+            with self._lock:
+                self._laufend.discard(schluessel)
+                if not werfen:
+                    stand = self._staende[schluessel]
+                    stand["fehler"] = f"{type(fehler).__name__}: {fehler}"
+                    # Nicht bei jedem Rerun erneut anfragen, während das Backend hakt
+                    stand["naechster_versuch"] = time.monotonic() + self.weich_ttl
+            if werfen:
+                raise
+            return
+
+        jetzt = time.monotonic()
+        with self._lock:
+            self._staende[schluessel] = {"daten": daten, "geladen": jetzt, "naechster_versuch": jetzt, "fehler": None}
+            # Erst zusammen mit dem neuen Stand freigeben – sonst startet ein Rerun dazwischen einen zweiten Ladevorgang
+            self._laufend.discard(schluessel)
+
+    def laedt(self, schluessel):
+        """True, solange für diesen Schlüssel eine Aktualisierung im Hintergrund läuft."""
+        with self._lock:
+            return schluessel in self._laufend
@@ -0,0 +1,190 @@
+from collections import Counter
+from html import escape
+
+import numpy as np
+
+from verlauf_chart import PUNKTE_BUDGET, lttb
+
+# Sekunden pro Ansicht in der Rotation
+ROTATION_S = 15
+# So viele Runden (die neuesten) passen als Spalten auf den Beamer
+TABELLEN_RUNDEN = 6
+# Altair-Standardpalette (tableau10), damit die Farben zur normalen Ansicht passen
+FARBEN = ("#4c78a8", "#f58518", "#e45756", "#72b7b2", "#54a24b",
+          "#eeca3b", "#b279a2", "#ff9da6", "#9d755d", "#bab0ac")
+
+SVG_BREITE, SVG_HOEHE, RAND = 1000, 420, 40
+
+CSS = """
+body { margin: 0; background: #0e1117; color: #fafafa; font-family: sans-serif; overflow: hidden; }
+.ansicht { display: none; padding: 1.5vh 2vw; }
+.ansicht.aktiv { display: block; }
+h2 { margin: 0 0 1vh; font-size: 4vh; }
+table { width: 100%; border-collapse: collapse; font-size: 2.6vh; }
+th, td { padding: 0.6vh 0.8vw; border-bottom: 1px solid #333; text-align: left; white-space: nowrap; }
+td.zahl { text-align: right; font-weight: bold; }
+svg { width: 100%; height: 70vh; }
+.legende span { margin-right: 1.5vw; font-size: 2.4vh; }
+.kacheln { display: grid; grid-template-columns: 1fr 1fr; gap: 2vh 2vw; }
+.kachel { background: #262730; border-radius: 1vh; padding: 2vh; }
+.kachel .titel { font-size: 2.4vh; color: #aaa; }
+.kachel .wert { font-size: 5vh; font-weight: bold; }
+.kommentar p { font-size: 4vh; line-height: 1.4; }
+"""
+
+# Ein Timer, ein Klassenwechsel – keine Animationen, läuft auch auf einem Raspberry Pi flüssig
+ROTATION_JS = """
+<script>
+(function () {
+  var ansichten = document.querySelectorAll(".ansicht"), i = 0;
+  if (ansichten.length < 2) return;
+  setInterval(function () {
+    ansichten[i].classList.remove("aktiv");
+    i = (i + 1) %% ansichten.length;
+    ansichten[i].classList.add("aktiv");
+  }, %d);
+})();
+</script>
+"""
+
+
+def _verlaeufe(spieler_liste):
+    """Punktestände ab Start (20 Punkte) pro Spieler."""
+    return {sp["name"]: np.asarray(sp["verlauf"], dtype=float) for sp in spieler_liste}
+
+
+def _namen(gruppe):
+    return escape(", ".join(sp["name"] for sp in gruppe))
+
+
+def tabelle_html(spieler_liste, runden_liste, bonus_pro_runde):
+    """Spielstand als HTML-Tabelle (Ranglistenreihenfolge) mit den neuesten Runden zuerst."""
+    erste = max(len(runden_liste) - TABELLEN_RUNDEN, 0)
+    indizes = range(len(runden_liste) - 1, erste - 1, -1)
+
+    kopf = "".join(f"<th>{escape(runden_liste[i]['name'])}</th>" for i in indizes)
+    zeilen = []
+    for sp in spieler_liste:
+        zellen = []
+        for i in indizes:
+            if i < len(sp["einsaetze"]):
+                bonus = "★" if sp["name"] in bonus_pro_runde[i] else ""
+                zellen.append(f"<td>E: {sp['einsaetze'][i]} | P: {sp['plaetze'][i]} | "
+                              f"{sp['gewinne'][i]:+.1f}{bonus}</td>")
+            else:
+                zellen.append("<td></td>")
+        zeilen.append(f"<tr><td class='zahl'>{sp['rang']}</td><td>{sp['trend']}</td><td>{escape(sp['name'])}</td>"
+                      f"<td class='zahl'>{sp['punkte']:.1f}</td>{''.join(zellen)}</tr>")
+
+    return (f"<h2>📊 Spielstand</h2><table><tr><th>Platz</th><th>Trend</th><th>Spieler</th><th>Punkte</th>{kopf}</tr>"
+            f"{''.join(zeilen)}</table>")
+
+
+def verlauf_svg(spieler_liste, budget=PUNKTE_BUDGET):
+    """Punkteverlauf als statisches SVG (LTTB-reduziert, kein Vega/JavaScript nötig)."""
+    verlaeufe = _verlaeufe(spieler_liste)
+    alle = np.concatenate(list(verlaeufe.values()))
+    y_min, y_max = float(np.floor(alle.min())), float(np.ceil(alle.max()))
+    x_max = max(max(len(v) for v in verlaeufe.values()) - 1, 1)
+
+    def px(x, y):
+        sx = RAND + x / x_max * (SVG_BREITE - 2 * RAND)
+        sy = SVG_HOEHE - RAND - (y - y_min) / max(y_max - y_min, 1) * (SVG_HOEHE - 2 * RAND)
+        return f"{sx:.1f},{sy:.1f}"
+
+    linien, legende = [], []
+    for nummer, (name, punkte) in enumerate(verlaeufe.items()):
+        farbe = FARBEN[nummer % len(FARBEN)]
+        behalten = lttb(np.arange(len(punkte), dtype=float), punkte, budget)
+        pfad = " ".join(px(i, punkte[i]) for i in behalten)
+        linien.append(f"<polyline fill='none' stroke='{farbe}' stroke-width='3' points='{pfad}'/>")
+        legende.append(f"<span style='color:{farbe}'>● {escape(name)} ({punkte[-1]:.1f})</span>")
+
+    achsen = (
+        f"<line x1='{RAND}' y1='{SVG_HOEHE - RAND}' x2='{SVG_BREITE - RAND}' y2='{SVG_HOEHE - RAND}' stroke='#666'/>"
+        f"<text x='{RAND}' y='{RAND - 10}' fill='#aaa' font-size='16'>{y_max:.0f}</text>"
+        f"<text x='{RAND}' y='{SVG_HOEHE - 10}' fill='#aaa' font-size='16'>{y_min:.0f}</text>"
+        f"<text x='{SVG_BREITE - RAND}' y='{SVG_HOEHE - 10}' fill='#aaa' font-size='16' text-anchor='end'>Runde {x_max}</text>"
+    )
+    return (f"<h2>📈 Punkteverlauf</h2><svg viewBox='0 0 {SVG_BREITE} {SVG_HOEHE}' preserveAspectRatio='none'>"
+            f"{achsen}{''.join(linien)}</svg><div class='legende'>{''.join(legende)}</div>")
+
+
+def statistik_html(spieler_liste, runden_liste, bonus_pro_runde):
+    """Die vier Kennzahlen der Anzeige-App als Kacheln."""
+    kacheln = []
+
+    siege = Counter({sp["name"]: sp["plaetze"].count(1) for sp in spieler_liste})
+    if siege and max(siege.values()):
+        name, anzahl = siege.most_common(1)[0]
+        kacheln.append(("🏆 Häufigster Rundensieger", name, f"{anzahl}×"))
+
+    verlaeufe = _verlaeufe(spieler_liste)
+    name = max(verlaeufe, key=lambda n: verlaeufe[n].max())
+    kacheln.append(("💯 Höchster Punktestand ever", name,
+                    f"{verlaeufe[name].max():.1f} Punkte ({int(verlaeufe[name].argmax())})"))
+
+    bonus = Counter(name for namen in bonus_pro_runde for name in namen)
+    if bonus:
+        name, anzahl = bonus.most_common(1)[0]
+        kacheln.append(("🎁 Häufigster Rubber-Banding-Nutzer", name, f"{anzahl}×"))
+
+    bester = max(
+        ((sp["name"], i, g) for sp in spieler_liste for i, g in enumerate(sp["gewinne"])),
+        key=lambda x: x[2], default=None
+    )
+    if bester:
+        kacheln.append(("🔥 Meisten Punkte in einem Spiel", bester[0],
+                        f"+{bester[2]:.1f} Punkte ({runden_liste[bester[1]]['name']})"))
+
+    inhalt = "".join(
+        f"<div class='kachel'><div class='titel'>{titel}</div><div class='wert'>{escape(name)}</div>"
+        f"<div>{escape(zusatz)}</div></div>"
+        for titel, name, zusatz in kacheln
+    )
+    return f"<h2>📌 Spielstatistik</h2><div class='kacheln'>{inhalt}</div>"
+
+
+def kommentar_html(spieler_liste, bonus_pro_runde):
+    """Kurzer, deterministischer Kommentar zur letzten Runde (gleich auf allen Bildschirmen)."""
+    # Gleichstand ist Gleichstand: alle mit dem besten Rundengewinn bzw. dem ersten/letzten Platz
+    bester_gewinn = max(sp["gewinne"][-1] if sp["gewinne"] else 0 for sp in spieler_liste)
+    rundensieger = [sp for sp in spieler_liste if (sp["gewinne"][-1] if sp["gewinne"] else 0) == bester_gewinn]
+    fuehrende = [sp for sp in spieler_liste if sp["rang"] == 1]
+    letzte = [sp for sp in spieler_liste if sp["rang"] == spieler_liste[-1]["rang"]]
+    zeilen = [
+        f"💥 <b>{_namen(rundensieger)}</b> holt die letzte Runde mit {bester_gewinn:+.1f} Punkten!",
+        f"🥇 <b>{_namen(fuehrende)}</b> führt mit {fuehrende[0]['punkte']:.1f} Punkten.",
+        f"🐢 <b>{_namen(letzte)}</b> jagt das Feld mit {letzte[0]['punkte']:.1f} Punkten.",
+    ]
+    if len(bonus_pro_runde) > 1 and bonus_pro_runde[-1]:
+        zeilen.append(f"🎁 Rubber-Banding-Bonus für <b>{escape(', '.join(bonus_pro_runde[-1]))}</b>.")
+    return "<h2>💬 Spielkommentar</h2><div class='kommentar'>" + "".join(f"<p>{z}</p>" for z in zeilen) + "</div>"
+
+
+def rendere_kiosk(spieler_liste, runden_liste, bonus_pro_runde, rotation_s=ROTATION_S):
+    """
+    Rendert alle Ansichten einmal als eigenständige HTML-Seite, die im Browser
+    selbstständig rotiert. Zwischen zwei Spielständen ist keine Python-Arbeit nötig.
+
+    Args:
+        spieler_liste: Spieler aus Spielverlauf.aktualisiere() (Ranglistenreihenfolge, mit "rang"/"trend")
+        runden_liste: Runden wie in "spiele/{name}" gespeichert
+        bonus_pro_runde: Bonus-Empfänger pro Runde aus Spielverlauf.aktualisiere()
+        rotation_s: Anzeigedauer pro Ansicht in Sekunden
+
+    Returns:
+        str: Vollständiges HTML-Dokument
+    """
+    fragmente = [
+        tabelle_html(spieler_liste, runden_liste, bonus_pro_runde),
+        verlauf_svg(spieler_liste),
+        statistik_html(spieler_liste, runden_liste, bonus_pro_runde),
+        kommentar_html(spieler_liste, bonus_pro_runde),
+    ]
+    ansichten = "".join(
+        f"<section class='ansicht{' aktiv' if i == 0 else ''}'>{fragment}</section>"
+        for i, fragment in enumerate(fragmente)
+    )
+    return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><style>{CSS}</style></head>"
+            f"<body>{ansichten}{ROTATION_JS % (rotation_s * 1000)}</body></html>")
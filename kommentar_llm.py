@@ -0,0 +1,209 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition
+
+from firestore_client import LESEN, SCHREIBEN
+
+# Harte Obergrenze für einen Modellaufruf – danach bleibt es beim Vorlagen-Kommentar
+TIMEOUT_SEKUNDEN = 8
+# Persistierte Kommentare (ein Dokument pro Spiel und Rundenversion)
+KOMMENTARE = "kommentare"
+# Reserve für das Schreiben des Ergebnisses – danach gilt ein "laeuft"-Anspruch als verwaist
+ANSPRUCH_PUFFER_S = 5
+# So viele fertige Kommentare hält ein Prozess im Speicher (LRU, ältester fliegt raus)
+MAX_FERTIGE_KOMMENTARE = 256
+
+SYSTEM_PROMPT = (
+    "Du bist ein witziger Sportkommentator bei den Vatertagsspielen. "
+    "Kommentiere die letzte Runde in höchstens vier kurzen Zeilen auf Deutsch, "
+    "mit Emojis und **fett** gesetzten Namen. Erfinde keine Zahlen."
+)
+
+
+class OpenAIClient:
+    """
+    Client für die OpenAI-API oder jeden kompatiblen lokalen Server
+    (z. B. llama.cpp oder Ollama über base_url).
+    """
+
+    def __init__(self, modell, base_url=None, api_key=None):
+        from openai import OpenAI
+
+        self.modell = modell
+        self.client = OpenAI(base_url=base_url, api_key=api_key or "lokal", max_retries=0)
+
+    def erzeuge(self, prompt, timeout):
+        antwort = self.client.chat.completions.create(
+            model=self.modell,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            timeout=timeout,
+        )
+        return antwort.choices[0].message.content.strip()
+
+
+class StubClient:
+    """Deterministischer Ersatz ohne Netzwerk, z. B. für Tests und Proben."""
+
+    def erzeuge(self, prompt, timeout):
+        zeilen = [zeile for zeile in prompt.splitlines() if zeile.startswith("- ")]
+        return "🤖 " + (zeilen[0][2:] if zeilen else "Keine Runde gespielt.")
+
+
+def erstelle_prompt(spieler_liste, bonus_empfaenger):
+    """
+    Beschreibt die Veränderung des Spielstands durch die letzte Runde.
+
+    Args:
+        spieler_liste: Spieler mit "punkte", "gewinne", "einsaetze" und "plaetze"
+        bonus_empfaenger: Name(n) des Rubber-Banding-Empfängers der letzten Runde
+
+    Returns:
+        str: Prompt für das Modell
+    """
+    zeilen = []
+    for sp in sorted(spieler_liste, key=lambda x: -x["punkte"]):
+        gewinn = sp["gewinne"][-1] if sp["gewinne"] else 0
+        zeilen.append(
+            f"- {sp['name']}: {sp['punkte'] - gewinn:.1f} → {sp['punkte']:.1f} Punkte "
+            f"(Einsatz {sp['einsaetze'][-1] if sp['einsaetze'] else 0}, "
+            f"Platz {sp['plaetze'][-1] if sp['plaetze'] else '–'}, {gewinn:+.1f})"
+        )
+    if bonus_empfaenger:
+        namen = bonus_empfaenger if isinstance(bonus_empfaenger, list) else [bonus_empfaenger]
+        zeilen.append(f"Rubber-Banding-Bonus (keine Minuspunkte) für: {', '.join(namen)}")
+    return "Spielstand nach der letzten Runde:\n" + "\n".join(zeilen)
+
+
+def rundenversion(spieler_liste, runden_liste):
+    """Eindeutige Version des Spielstands: Rundenzahl plus Hash aller Ergebnisse."""
+    inhalt = json.dumps(
+        [(sp["name"], sp["einsaetze"], sp["plaetze"], sp["gewinne"]) for sp in spieler_liste],
+        sort_keys=True, default=str,
+    )
+    return f"{len(runden_liste)}-{hashlib.sha1(inhalt.encode('utf-8')).hexdigest()[:12]}"
+
+
+class KommentarDienst:
+    """
+    Erzeugt LLM-Kommentare im Hintergrund – nie im Render-Pfad.
+
+    Pro (Spiel, Rundenversion) gibt es genau eine Generierung: innerhalb des
+    Prozesses über ein Auftrags-Dict, über Prozesse hinweg über ein per
+    create() reserviertes Firestore-Dokument.
+    """
+
+    def __init__(self, client, db=None, timeout=TIMEOUT_SEKUNDEN):
+        self.client = client
+        self.db = db
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._fertig = OrderedDict()
+        self._laufend = set()
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kommentar")
+
+    def kommentar(self, spiel, version, prompt):
+        """
+        Liefert den fertigen Kommentar oder None (dann Vorlage anzeigen).
+        Stößt die Generierung einmalig im Hintergrund an.
+        """
+        schluessel = (spiel, version)
+        with self._lock:
+            if schluessel in self._fertig:
+                self._fertig.move_to_end(schluessel)
+                return self._fertig[schluessel]
+            if schluessel not in self._laufend:
+                self._laufend.add(schluessel)
+                self._worker.submit(self._erzeuge, schluessel, prompt)
+        return None
+
+    def _ref(self, schluessel):
+        doc_id = hashlib.sha1("|".join(schluessel).encode("utf-8")).hexdigest()
+        return self.db.collection(KOMMENTARE).document(doc_id)
+
+    def _erzeuge(self, schluessel, prompt):
+        text = None
+        try:
+            text = self._persistiert_oder_erzeugt(schluessel, prompt)
+        except Exception:
+            text = None
+        finally:
+            with self._lock:
+                self._laufend.discard(schluessel)
+                # "" = endgültig fehlgeschlagen → Vorlage, kein zweiter Versuch
+                if text is not None:
+                    self._fertig[schluessel] = text
+                    while len(self._fertig) > MAX_FERTIGE_KOMMENTARE:
+                        self._fertig.popitem(last=False)
+
+    def _persistiert_oder_erzeugt(self, schluessel, prompt):
+        if self.db is None:
+            return self._generiere(prompt)
+
+        ref = self._ref(schluessel)
+        if not self._beanspruche(ref, schluessel):
+            # Ein anderer Prozess generiert bereits – auf sein Ergebnis warten
+            ende = time.monotonic() + self.timeout + 2 * ANSPRUCH_PUFFER_S
+            while True:
+                doc = ref.get(**LESEN)
+                daten = doc.to_dict() or {}
+                if doc.exists and daten.get("status") != "laeuft":
+                    return daten.get("text", "")
+                if self._uebernimm_verwaist(ref, doc, schluessel):
+                    break
+                if time.monotonic() >= ende:
+                    return ""  # Aufgeben → Vorlage, ohne bei jedem Rerun erneut zu warten
+                time.sleep(0.5)
+
+        text = self._generiere(prompt)
+        try:
+            ref.update({"status": "fertig" if text else "fehler", "text": text}, **SCHREIBEN)
+        except Exception:
+            pass  # Lokal trotzdem anzeigen; andere Prozesse übernehmen den verwaisten Anspruch
+        return text
+
+    def _beanspruche(self, ref, schluessel):
+        """Reserviert die Generierung per create(); False, wenn schon jemand anders dran ist."""
+        try:
+            ref.create({
+                "spiel": schluessel[0],
+                "version": schluessel[1],
+                "status": "laeuft",
+                "beansprucht": time.time(),
+            }, **SCHREIBEN)
+            return True
+        except AlreadyExists:
+            return False
+
+    def _uebernimm_verwaist(self, ref, doc, schluessel):
+        """
+        Übernimmt einen Anspruch, dessen Besitzer abgestürzt ist oder sein Ergebnis
+        nicht schreiben konnte. Die update_time-Vorbedingung sorgt dafür, dass nur
+        ein Prozess übernimmt.
+        """
+        if not doc.exists:
+            return self._beanspruche(ref, schluessel)
+        if time.time() - doc.to_dict().get("beansprucht", 0) <= self.timeout + ANSPRUCH_PUFFER_S:
+            return False
+        try:
+            ref.update(
+                {"beansprucht": time.time()},
+                option=self.db.write_option(last_update_time=doc.update_time),
+                **SCHREIBEN
+            )
+            return True
+        except FailedPrecondition:
+            return False  # Ein anderer Prozess war schneller
+
+    def _generiere(self, prompt):
+        try:
+            return self.client.erzeuge(prompt, self.timeout)
+        except Exception:
+            return ""
@@ -0,0 +1,167 @@
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Wie viele Messungen pro Stufe im Ringpuffer gehalten werden
+PUFFER_GROESSE = 500
+
+_lock = threading.Lock()
+_messungen = {}
+_zaehler = Counter()
+_werte = {}
+_server = None
+
+
+def erfasse(stufe, dauer):
+    """Speichert eine Dauer (Sekunden) im Ringpuffer der Stufe."""
+    with _lock:
+        if stufe not in _messungen:
+            _messungen[stufe] = deque(maxlen=PUFFER_GROESSE)
+        _messungen[stufe].append(dauer)
+
+
+@contextmanager
+def messe(stufe):
+    """
+    Misst die Laufzeit des Blocks und legt sie unter der Stufe ab.
+
+    Beispiel:
+        with messe("firestore.get"):
+            doc = ref.get()
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        erfasse(stufe, time.perf_counter() - start)
+
+
+def zaehle(name, anzahl=1):
+    """Erhöht einen Zähler (z. B. Cache-Aufrufe und -Misses)."""
+    with _lock:
+        _zaehler[name] += anzahl
+
+
+def setze(name, wert):
+    """Setzt einen Momentanwert (z. B. Größe der Altair-Spec in Bytes)."""
+    with _lock:
+        _werte[name] = wert
+
+
+def _perzentil(sortiert, anteil):
+    return sortiert[min(int(anteil * len(sortiert)), len(sortiert) - 1)]
+
+
+def auswertung():
+    """
+    Fasst den Ringpuffer pro Stufe zusammen.
+
+    Returns:
+        list: Ein Dict pro Stufe mit Anzahl, p50, p95 und Maximum in Millisekunden
+    """
+    with _lock:
+        kopie = {stufe: sorted(werte) for stufe, werte in _messungen.items()}
+    return [
+        {
+            "stufe": stufe,
+            "anzahl": len(werte),
+            "p50_ms": _perzentil(werte, 0.50) * 1000,
+            "p95_ms": _perzentil(werte, 0.95) * 1000,
+            "max_ms": werte[-1] * 1000,
+        }
+        for stufe, werte in sorted(kopie.items())
+        if werte
+    ]
+
+
+def zaehlerstaende():
+    """Momentaufnahme aller Zähler und Momentanwerte."""
+    with _lock:
+        return dict(_zaehler), dict(_werte)
+
+
+def als_json():
+    zaehler, werte = zaehlerstaende()
+    return json.dumps({"stufen": auswertung(), "zaehler": zaehler, "werte": werte})
+
+
+def als_prometheus():
+    """Metriken im Prometheus-Textformat."""
+    zeilen = [
+        "# TYPE vatertag_stufe_sekunden summary",
+    ]
+    for eintrag in auswertung():
+        label = f'stufe="{eintrag["stufe"]}"'
+        zeilen.append(f'vatertag_stufe_sekunden{{{label},quantile="0.5"}} {eintrag["p50_ms"] / 1000:.6f}')
+        zeilen.append(f'vatertag_stufe_sekunden{{{label},quantile="0.95"}} {eintrag["p95_ms"] / 1000:.6f}')
+        zeilen.append(f'vatertag_stufe_sekunden_count{{{label}}} {eintrag["anzahl"]}')
+
+    zaehler, werte = zaehlerstaende()
+    zeilen.append("# TYPE vatertag_zaehler counter")
+    for name, wert in sorted(zaehler.items()):
+        zeilen.append(f'vatertag_zaehler{{name="{name}"}} {wert}')
+    zeilen.append("# TYPE vatertag_wert gauge")
+    for name, wert in sorted(werte.items()):
+        zeilen.append(f'vatertag_wert{{name="{name}"}} {wert}')
+    return "\n".join(zeilen) + "\n"
+
+
+class _MetrikHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            inhalt, typ = als_json(), "application/json"
+        elif self.path.startswith("/metrics"):
+            inhalt, typ = als_prometheus(), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        daten = inhalt.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", typ)
+        self.send_header("Content-Length", str(len(daten)))
+        self.end_headers()
+        self.wfile.write(daten)
+
+    def log_message(self, *args):
+        pass
+
+
+def starte_metrik_server(port, host="127.0.0.1"):
+    """
+    Startet (einmal pro Prozess) einen kleinen HTTP-Server im Hintergrund,
+    der /metrics (Prometheus) und /metrics.json ausliefert.
+
+    Ohne Authentifizierung – daher standardmäßig nur lokal erreichbar. Für einen
+    Prometheus auf einem anderen Rechner host bewusst setzen (z. B. "0.0.0.0").
+
+    Args:
+        port: TCP-Port
+        host: Adresse, an die der Server bindet
+    """
+    global _server
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetrikHandler)
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+def starte_profil():
+    """Startet ein cProfile für den restlichen Rerun (opt-in)."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def profil_bericht(profiler, anzahl=30):
+    """Beendet das Profil und liefert die teuersten Funktionen als Text."""
+    profiler.disable()
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(anzahl)
+    return text.getvalue()
@@ -0,0 +1,131 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# Einsätze sind im Eingabe-Formular auf 0–3 begrenzt
+MIN_EINSATZ = 0
+MAX_EINSATZ = 3
+
+# Simulationsumfang: höchstens so viele Zellen (Simulationen × Spieler × Restrunden),
+# damit die Prognose auch bei vielen Spielern und Runden deutlich unter einer Sekunde bleibt
+MAX_SIMULATIONEN = 100_000
+MIN_SIMULATIONEN = 10_000
+ZELLEN_BUDGET = 10_000_000
+
+
+def _simuliere_block(punkte, multiplikatoren, restrunden, anzahl, seed):
+    """
+    Simuliert einen Block von Spielverläufen gleichzeitig (Simulationen × Spieler).
+
+    Returns:
+        np.ndarray: Summe der Siegesanteile pro Spieler über alle Simulationen
+    """
+    rng = np.random.default_rng(seed)
+    n = len(punkte)
+
+    # Multiplikator pro Platz (Platz - 1 als Index), fehlende Plätze zählen 0
+    mult = np.zeros(max(n, len(multiplikatoren)))
+    mult[:len(multiplikatoren)] = multiplikatoren
+
+    # Spieler × Simulationen: Minimum und Maximum über die Spieler laufen über ganze Zeilen statt kurzer Zeilenstücke
+    stand = np.repeat(np.asarray(punkte, dtype=float)[:, None], anzahl, axis=1)
+    # Puffer einmal anlegen und jede Runde wiederverwenden
+    schluessel = np.empty((anzahl, n), dtype=np.float32)
+    gewinne = np.empty((n, anzahl))
+    letzte = np.empty((n, anzahl), dtype=bool)
+    verlust = np.empty((n, anzahl), dtype=bool)
+
+    for _ in range(restrunden):
+        # Rubber-Banding: alle Letzten vor der Runde verlieren nichts (wie rangliste.letzte)
+        np.equal(stand, stand.min(axis=0), out=letzte)
+
+        einsaetze = rng.integers(MIN_EINSATZ, MAX_EINSATZ + 1, size=(n, anzahl), dtype=np.int8)
+        # Zufällige Platzvergabe pro Simulation: argsort zufälliger Schlüssel (schneller als rng.permuted)
+        rng.random(dtype=np.float32, out=schluessel)
+        np.multiply(einsaetze, mult[schluessel.argsort(axis=1)].T, out=gewinne)
+
+        np.less(gewinne, 0, out=verlust)
+        np.logical_and(letzte, verlust, out=letzte)
+        np.copyto(gewinne, 0, where=letzte)
+        stand += gewinne
+
+    # Gleichstand an der Spitze: Sieg wird geteilt
+    sieger = stand == stand.max(axis=0)
+    return (sieger / sieger.sum(axis=0)).sum(axis=1)
+
+
+def ausgeschiedene_spieler(punkte, multiplikatoren, restrunden):
+    """
+    Ermittelt, wer rechnerisch nicht mehr gewinnen kann.
+
+    Ein Spieler ist raus, wenn selbst sein bester Verlauf (immer Höchsteinsatz
+    auf dem besten Platz) unter dem schlechtesten Verlauf eines anderen bleibt.
+    Rubber-Banding hebt nur den schlechtesten Fall an, die Schranke bleibt also gültig.
+
+    Returns:
+        list: bool pro Spieler
+    """
+    bester_gewinn = MAX_EINSATZ * max(max(multiplikatoren, default=0), 0)
+    schlechtester_gewinn = MAX_EINSATZ * min(min(multiplikatoren, default=0), 0)
+
+    bestfall = [p + restrunden * bester_gewinn for p in punkte]
+    schlechtfall = [p + restrunden * schlechtester_gewinn for p in punkte]
+
+    ergebnis = []
+    for i, best in enumerate(bestfall):
+        andere = [s for j, s in enumerate(schlechtfall) if j != i]
+        ergebnis.append(bool(andere) and best < max(andere))
+    return ergebnis
+
+
+def anzahl_simulationen(spieler, restrunden):
+    """Simulationen für das Zellenbudget, begrenzt auf MIN_SIMULATIONEN…MAX_SIMULATIONEN."""
+    zellen_pro_simulation = max(spieler * restrunden, 1)
+    return int(min(MAX_SIMULATIONEN, max(MIN_SIMULATIONEN, ZELLEN_BUDGET // zellen_pro_simulation)))
+
+
+def simuliere_endstand(namen, punkte, multiplikatoren, restrunden, simulationen=None, prozesse=1, seed=None):
+    """
+    Monte-Carlo-Prognose des Endstands über die verbleibenden Runden.
+
+    Args:
+        namen: Spielernamen
+        punkte: Aktuelle Punktestände (gleiche Reihenfolge wie namen)
+        multiplikatoren: Multiplikatoren für Plätze
+        restrunden: Anzahl noch zu spielender Runden
+        simulationen: Anzahl simulierter Spielverläufe (None = anzahl_simulationen())
+        prozesse: Anzahl Prozesse (1 = im aktuellen Prozess rechnen)
+        seed: Optionaler Seed für reproduzierbare Ergebnisse
+
+    Returns:
+        list: Ein Dict pro Spieler mit Siegchance und Ausgeschieden-Flag
+    """
+    ausgeschieden = ausgeschiedene_spieler(punkte, multiplikatoren, restrunden)
+    if simulationen is None:
+        simulationen = anzahl_simulationen(len(punkte), restrunden)
+
+    if restrunden <= 0:
+        # Nichts mehr zu simulieren – der aktuelle Stand ist der Endstand
+        anteile = _simuliere_block(punkte, multiplikatoren, 0, 1, seed)
+        simulationen = 1
+    else:
+        seeds = np.random.SeedSequence(seed).spawn(max(prozesse, 1))
+        bloecke = [len(b) for b in np.array_split(np.arange(simulationen), len(seeds))]
+        if prozesse > 1:
+            with ProcessPoolExecutor(max_workers=prozesse) as pool:
+                teile = pool.map(
+                    _simuliere_block,
+                    [punkte] * len(seeds), [multiplikatoren] * len(seeds),
+                    [restrunden] * len(seeds), bloecke, seeds,
+                )
+                anteile = sum(teile)
+        else:
+            anteile = _simuliere_block(punkte, multiplikatoren, restrunden, simulationen, seeds[0])
+
+    return [
+        {
+            "name": name,
+            "siegchance": float(anteile[i] / simulationen),
+            "ausgeschieden": ausgeschieden[i],
+        }
+        for i, name in enumerate(namen)
+    ]
@@ -0,0 +1,228 @@
+import threading
+from bisect import bisect_left, insort
+
+
+class Rangliste:
+    """
+    Immer sortierte Punkteliste: eine Punkteänderung sucht per bisect (O(log n))
+    und verschiebt nur einen Eintrag statt alle Spieler neu zu sortieren.
+
+    Gleichstand ist Gleichstand – Ränge, Letzte (Rubber-Banding) und Führende
+    werden über exakt gleiche Punktzahlen bestimmt.
+    """
+
+    def __init__(self, punkte):
+        """
+        Args:
+            punkte: dict Spielername → Punkte
+        """
+        self._punkte = dict(punkte)
+        # (-Punkte, Name): absteigend nach Punkten, bei Gleichstand alphabetisch
+        self._eintraege = sorted((-p, name) for name, p in self._punkte.items())
+        # Unterschiedliche Punktzahlen (negiert, aufsteigend) mit Häufigkeit – für dichte Ränge
+        self._werte = sorted({-p for p in self._punkte.values()})
+        self._haeufigkeit = {}
+        for p in self._punkte.values():
+            self._haeufigkeit[-p] = self._haeufigkeit.get(-p, 0) + 1
+        self._vorher = ([], {})
+
+    def __len__(self):
+        return len(self._eintraege)
+
+    def punkte(self, name):
+        return self._punkte[name]
+
+    def setze(self, name, punkte):
+        """Neue Punktzahl eines Spielers einsortieren."""
+        alt = -self._punkte[name]
+        del self._eintraege[bisect_left(self._eintraege, (alt, name))]
+        self._haeufigkeit[alt] -= 1
+        if not self._haeufigkeit[alt]:
+            del self._haeufigkeit[alt]
+            del self._werte[bisect_left(self._werte, alt)]
+
+        self._punkte[name] = punkte
+        insort(self._eintraege, (-punkte, name))
+        if -punkte not in self._haeufigkeit:
+            insort(self._werte, -punkte)
+        self._haeufigkeit[-punkte] = self._haeufigkeit.get(-punkte, 0) + 1
+
+    def addiere(self, name, gewinn):
+        if gewinn:
+            self.setze(name, self._punkte[name] + gewinn)
+
+    def rang(self, name, dicht=False):
+        """
+        Platz eines Spielers.
+
+        Args:
+            dicht: False = Wettkampf-Rang (1, 1, 3), True = dichter Rang (1, 1, 2)
+        """
+        schluessel = -self._punkte[name]
+        if dicht:
+            return bisect_left(self._werte, schluessel) + 1
+        return bisect_left(self._eintraege, (schluessel,)) + 1
+
+    def reihenfolge(self):
+        """Namen vom Ersten zum Letzten."""
+        return [name for _, name in self._eintraege]
+
+    def fuehrende(self):
+        """Alle Spieler mit der höchsten Punktzahl."""
+        if not self._eintraege:
+            return []
+        spitze = self._eintraege[0][0]
+        return [name for _, name in self._eintraege[:self._haeufigkeit[spitze]]]
+
+    def letzte(self):
+        """Alle Spieler mit der niedrigsten Punktzahl (Rubber-Banding-Empfänger)."""
+        if not self._eintraege:
+            return []
+        ende = self._eintraege[-1][0]
+        return [name for _, name in self._eintraege[-self._haeufigkeit[ende]:]]
+
+    def merke(self):
+        """
+        Aktuellen Stand als Vergleichsbasis für delta() festhalten (z. B. vor der letzten Runde).
+        Nur eine Kopie (O(n)) – die alten Ränge werden erst in delta() per bisect bestimmt.
+        """
+        self._vorher = (list(self._eintraege), dict(self._punkte))
+
+    def delta(self, name):
+        """Plätze gewonnen (+) oder verloren (–) seit merke()."""
+        eintraege, punkte = self._vorher
+        if name not in punkte:
+            return 0
+        return bisect_left(eintraege, (-punkte[name],)) + 1 - self.rang(name)
+
+
+def trend(delta):
+    """▲/▼ mit Anzahl Plätze, leer bei unveränderter Position."""
+    if delta > 0:
+        return f"▲{delta}"
+    if delta < 0:
+        return f"▼{-delta}"
+    return ""
+
+
+def _rundenschluessel(runde):
+    return dict(runde.get("einsaetze", {})), dict(runde.get("plaetze", {}))
+
+
+class Spielverlauf:
+    """
+    Rangliste und Spalten eines Spiels über Reruns hinweg.
+
+    Pro Aktualisierung werden nur die Runden ab der ersten Abweichung neu
+    gerechnet – beim Live-Spiel also die angehängte oder gerade korrigierte
+    letzte Runde. Andere Spieler oder Multiplikatoren bauen alles neu auf.
+    Die Wertung (Rubber-Banding für alle Letzten ab Runde 2) steht nur hier,
+    damit alle Anzeigen dieselben Punkte und Plätze zeigen.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self._setze_zurueck([], [])
+
+    def _setze_zurueck(self, namen, multiplikatoren):
+        self._namen = namen
+        self._multiplikatoren = multiplikatoren
+        self._rangliste = Rangliste({name: 20.0 for name in namen})
+        # verlauf[i] = Punkte vor Runde i (verlauf[0] = Start)
+        self._spalten = {
+            name: {"einsaetze": [], "plaetze": [], "gewinne": [], "verlauf": [20.0]} for name in namen
+        }
+        self._rundenschluessel = []
+        self._bonus = []
+
+    def aktualisiere(self, version, namen, runden, multiplikatoren):
+        """
+        Bringt die Rangliste auf den Stand der Runden und liefert diesen Stand.
+
+        Aktualisieren und Kopieren passieren unter demselben Lock – eine parallele
+        Sitzung mit anderen Runden kann den gelieferten Stand nicht mehr verändern.
+
+        Args:
+            version: Spielversion (bei gleicher Version wird nichts gerechnet; None = immer vergleichen)
+            namen: Spielernamen in Spielreihenfolge
+            runden: Runden mit "einsaetze" und "plaetze" (dict Name → Wert)
+            multiplikatoren: Multiplikatoren für Plätze
+
+        Returns:
+            tuple: (Spieler in Ranglistenreihenfolge, Bonus-Empfänger pro Runde) – Kopien; je Spieler
+                   name, einsaetze, plaetze, gewinne, verlauf, punkte, rang, rang_delta, trend
+        """
+        with self._lock:
+            if version is not None and version == self.version:
+                return self._stand()
+            namen, multiplikatoren = list(namen), list(multiplikatoren)
+            if namen != self._namen or multiplikatoren != self._multiplikatoren:
+                self._setze_zurueck(namen, multiplikatoren)
+
+            bekannt = len(self._rundenschluessel)
+            gleich = 0
+            while gleich < min(bekannt, len(runden)) and self._rundenschluessel[gleich] == _rundenschluessel(runden[gleich]):
+                gleich += 1
+
+            if gleich < max(bekannt, len(runden)):
+                # Die letzte Runde immer neu spielen, damit merke() genau vor ihr steht
+                self._spule_zurueck(max(min(gleich, len(runden) - 1), 0))
+                for i in range(len(self._rundenschluessel), len(runden)):
+                    if i == len(runden) - 1:
+                        self._rangliste.merke()
+                    self._spiele_runde(i, runden[i])
+            self.version = version
+            return self._stand()
+
+    def _spule_zurueck(self, bis):
+        """Runden ab Index bis verwerfen – Punkte exakt auf den gespeicherten Stand, ohne Rundungsdrift."""
+        if bis >= len(self._rundenschluessel):
+            return
+        for name, spalten in self._spalten.items():
+            self._rangliste.setze(name, spalten["verlauf"][bis])
+            del spalten["einsaetze"][bis:], spalten["plaetze"][bis:], spalten["gewinne"][bis:]
+            del spalten["verlauf"][bis + 1:]
+        del self._rundenschluessel[bis:], self._bonus[bis:]
+        self._rangliste.merke()
+
+    def _spiele_runde(self, i, runde):
+        # Bonus ab Runde 2 für alle Letzten (bei Gleichstand mehrere)
+        letzte = set(self._rangliste.letzte()) if i > 0 else set()
+        self._bonus.append([name for name in self._namen if name in letzte])
+
+        for name in self._namen:
+            einsatz = runde["einsaetze"].get(name, 0)
+            platz = runde["plaetze"].get(name, 1)
+            multiplikator = self._multiplikatoren[platz - 1] if platz - 1 < len(self._multiplikatoren) else 0
+            gewinn = float(einsatz * multiplikator)
+            if name in letzte and gewinn < 0:
+                gewinn = 0.0
+
+            spalten = self._spalten[name]
+            spalten["einsaetze"].append(einsatz)
+            spalten["plaetze"].append(platz)
+            spalten["gewinne"].append(gewinn)
+            spalten["verlauf"].append(spalten["verlauf"][-1] + gewinn)
+            if gewinn:
+                self._rangliste.setze(name, spalten["verlauf"][-1])
+
+        self._rundenschluessel.append(_rundenschluessel(runde))
+
+    def _stand(self):
+        spieler = []
+        for name in self._rangliste.reihenfolge():
+            spalten = self._spalten[name]
+            rang_delta = self._rangliste.delta(name)
+            spieler.append({
+                "name": name,
+                "einsaetze": list(spalten["einsaetze"]),
+                "plaetze": list(spalten["plaetze"]),
+                "gewinne": list(spalten["gewinne"]),
+                "verlauf": list(spalten["verlauf"]),
+                "punkte": spalten["verlauf"][-1],
+                "rang": self._rangliste.rang(name),
+                "rang_delta": rang_delta,
+                "trend": trend(rang_delta),
+            })
+        return spieler, [list(b) for b in self._bonus]
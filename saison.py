@@ -0,0 +1,240 @@
+import argparse
+
+from firebase_admin import firestore
+
+from firestore_client import get_firestore_client, LESEN, SCHREIBEN
+
+# Kompakte Zusammenfassung pro Spiel (eine pro Dokument in "spiele")
+ZUSAMMENFASSUNGEN = "spielzusammenfassungen"
+# Ewige Bestenliste, inkrementell aus allen Zusammenfassungen zusammengeführt
+REKORDE_DOKUMENT = ("saison", "rekorde")
+
+# Summierbare Kennzahlen pro Spieler (werden per Increment zusammengeführt)
+SUMMEN_FELDER = ("spiele", "siege", "rundensiege", "bonus", "einsatz", "gewinn")
+
+# Wie viele Dokumente get_all() beim Backfill auf einmal lädt
+BACKFILL_BLOCKGROESSE = 100
+# Spiele pro Transaktion beim Schreiben mehrerer Zusammenfassungen (Firestore: max. 500 Schreibvorgänge)
+SCHREIB_BLOCKGROESSE = 400
+
+
+def erstelle_zusammenfassung(spieler_liste, runden_liste):
+    """
+    Verdichtet ein gespeichertes Spiel auf wenige Kennzahlen pro Spieler.
+    Nutzt die gespeicherten Gewinne, es wird also nichts nachgespielt.
+
+    Args:
+        spieler_liste: Spieler wie in "spiele/{name}" gespeichert
+        runden_liste: Runden wie in "spiele/{name}" gespeichert
+
+    Returns:
+        dict: Zusammenfassung mit Rundenanzahl und Kennzahlen pro Spieler
+    """
+    anzahl_runden = min((len(sp.get("gewinne", [])) for sp in spieler_liste), default=0)
+    spieler = {
+        sp["name"]: {
+            "spiele": 1,
+            "siege": 0,
+            "rundensiege": 0,
+            "bonus": 0,
+            "einsatz": float(sum(sp.get("einsaetze", [])[:anzahl_runden])),
+            "gewinn": float(sum(sp.get("gewinne", [])[:anzahl_runden])),
+            "max_punkte": 20.0,
+        }
+        for sp in spieler_liste
+    }
+
+    # Rundensieger wie in berechne_statistiken: höchster Gewinn der Runde
+    for i in range(anzahl_runden):
+        rundensieger = max(spieler_liste, key=lambda sp: sp["gewinne"][i])
+        spieler[rundensieger["name"]]["rundensiege"] += 1
+
+    # Bonus-Empfänger ab Runde 2, so wie sie beim Speichern ermittelt wurden
+    for runde in runden_liste[1:anzahl_runden]:
+        for name in runde.get("bonus_empfaenger") or []:
+            if name in spieler:
+                spieler[name]["bonus"] += 1
+
+    # Höchster Zwischenstand und Endstand
+    endstand = {}
+    for sp in spieler_liste:
+        kumuliert = 20.0
+        for gewinn in sp.get("gewinne", [])[:anzahl_runden]:
+            kumuliert += gewinn
+            spieler[sp["name"]]["max_punkte"] = max(spieler[sp["name"]]["max_punkte"], kumuliert)
+        endstand[sp["name"]] = kumuliert
+
+    # Gleichstand an der Spitze: jeder der Führenden bekommt den Sieg (wie rangliste.fuehrende)
+    if endstand and anzahl_runden:
+        bester = max(endstand.values())
+        for name, punkte in endstand.items():
+            if punkte == bester:
+                spieler[name]["siege"] = 1
+
+    return {"runden": anzahl_runden, "spieler": spieler}
+
+
+def _delta(alt, neu):
+    """Differenz der summierbaren Kennzahlen zwischen zwei Zusammenfassungen."""
+    alte_spieler = (alt or {}).get("spieler", {})
+    neue_spieler = (neu or {}).get("spieler", {})
+    delta = {}
+    for name in set(alte_spieler) | set(neue_spieler):
+        werte = {}
+        for feld in SUMMEN_FELDER:
+            diff = neue_spieler.get(name, {}).get(feld, 0) - alte_spieler.get(name, {}).get(feld, 0)
+            if diff:
+                werte[feld] = diff
+        if werte:
+            delta[name] = werte
+    return delta
+
+
+def _bestes_anderes_spiel(transaction, db, spielnamen, name):
+    """Höchster Punktestand eines Spielers in allen Zusammenfassungen außer spielnamen."""
+    feld = firestore.FieldPath("spieler", name, "max_punkte").to_api_repr()
+    abfrage = (
+        db.collection(ZUSAMMENFASSUNGEN)
+        .order_by(feld, direction=firestore.Query.DESCENDING)
+        .limit(len(spielnamen) + 1)  # Die gerade geänderten Spiele selbst können vorne stehen
+    )
+    for doc in transaction.get(abfrage):
+        if doc.id not in spielnamen:
+            return doc.to_dict()["spieler"][name]["max_punkte"]
+    return 20.0
+
+
+@firestore.transactional
+def _schreibe_zusammenfassungen(transaction, db, neue):
+    refs = {spielname: db.collection(ZUSAMMENFASSUNGEN).document(spielname) for spielname in neue}
+    rekorde_ref = db.collection(REKORDE_DOKUMENT[0]).document(REKORDE_DOKUMENT[1])
+    alte = {doc.id: doc.to_dict() for doc in transaction.get_all(list(refs.values())) if doc.exists}
+    rekorde_doc = rekorde_ref.get(transaction=transaction)
+    rekorde = (rekorde_doc.to_dict() or {}).get("spieler", {}) if rekorde_doc.exists else {}
+
+    # Änderungen aller Spiele des Blocks zu einem Increment pro Spieler und Feld zusammenfassen
+    summen = {}
+    hoechste = {}
+    neu_bestimmen = set()
+    for spielname, neu in neue.items():
+        alt = alte.get(spielname)
+        for name, werte in _delta(alt, neu).items():
+            ziel = summen.setdefault(name, {})
+            for feld, wert in werte.items():
+                ziel[feld] = ziel.get(feld, 0) + wert
+
+        neue_spieler = neu["spieler"] if neu is not None else {}
+        for name, werte in neue_spieler.items():
+            hoechste[name] = max(hoechste.get(name, 20.0), werte["max_punkte"])
+
+        # Maximum kann nur steigen: hielt dieses Spiel den Rekord und sinkt (oder verschwindet)
+        # sein Wert, wird der Rekord aus den übrigen Zusammenfassungen neu bestimmt
+        for name, werte in (alt or {}).get("spieler", {}).items():
+            neuer_wert = neue_spieler.get(name, {}).get("max_punkte", 20.0)
+            if neuer_wert < werte["max_punkte"] and rekorde.get(name, {}).get("max_punkte", 20.0) <= werte["max_punkte"]:
+                neu_bestimmen.add(name)
+
+    aggregat = {
+        name: {feld: firestore.Increment(wert) for feld, wert in werte.items() if wert}
+        for name, werte in summen.items()
+    }
+    for name, wert in hoechste.items():
+        aggregat.setdefault(name, {})["max_punkte"] = firestore.Maximum(wert)
+    for name in neu_bestimmen:
+        aggregat.setdefault(name, {})["max_punkte"] = max(
+            hoechste.get(name, 20.0), _bestes_anderes_spiel(transaction, db, set(neue), name)
+        )
+
+    for spielname, neu in neue.items():
+        if neu is not None:
+            transaction.set(refs[spielname], {**neu, "aktualisiert": firestore.SERVER_TIMESTAMP})
+        else:
+            transaction.delete(refs[spielname])
+
+    aggregat = {name: werte for name, werte in aggregat.items() if werte}
+    if aggregat:
+        transaction.set(rekorde_ref, {"spieler": aggregat}, merge=True)
+
+
+def aktualisiere_zusammenfassungen(db, zusammenfassungen, blockgroesse=SCHREIB_BLOCKGROESSE):
+    """
+    Schreibt die Zusammenfassungen mehrerer Spiele und führt nur deren Änderung
+    gegenüber der vorherigen Version in die Bestenliste ein – eine Transaktion
+    pro Block statt einer pro Spiel. Wird ein Rekord-Höchststand zurückgenommen,
+    wird er aus den übrigen Spielen neu bestimmt.
+
+    Args:
+        db: Firestore Client
+        zusammenfassungen: dict Spielname → Ergebnis von erstelle_zusammenfassung (None zum Entfernen)
+        blockgroesse: Spiele pro Transaktion (plus ein Schreibzugriff auf die Bestenliste)
+    """
+    namen = list(zusammenfassungen)
+    for start in range(0, len(namen), blockgroesse):
+        block = {name: zusammenfassungen[name] for name in namen[start:start + blockgroesse]}
+        _schreibe_zusammenfassungen(db.transaction(), db, block)
+
+
+def aktualisiere_zusammenfassung(db, spielname, zusammenfassung):
+    """
+    Schreibt die Zusammenfassung eines Spiels (siehe aktualisiere_zusammenfassungen).
+
+    Args:
+        db: Firestore Client
+        spielname: Name des Spiels
+        zusammenfassung: Ergebnis von erstelle_zusammenfassung, None zum Entfernen
+    """
+    aktualisiere_zusammenfassungen(db, {spielname: zusammenfassung})
+
+
+def backfill(db, blockgroesse=BACKFILL_BLOCKGROESSE):
+    """
+    Erstellt alle Zusammenfassungen neu und baut die Bestenliste von Grund auf.
+    Spiele werden blockweise per get_all() geladen und per Batch geschrieben.
+    Zusammenfassungen von Spielen, die es nicht mehr gibt, werden gelöscht.
+
+    Returns:
+        int: Anzahl verarbeiteter Spiele
+    """
+    refs = list(db.collection("spiele").list_documents())
+
+    # Verwaiste Zusammenfassungen zuerst entfernen – sonst tauchen sie in Rekord-Abfragen wieder auf
+    spiel_ids = {ref.id for ref in refs}
+    verwaist = [ref for ref in db.collection(ZUSAMMENFASSUNGEN).list_documents() if ref.id not in spiel_ids]
+    for start in range(0, len(verwaist), SCHREIB_BLOCKGROESSE):
+        batch = db.batch()
+        for ref in verwaist[start:start + SCHREIB_BLOCKGROESSE]:
+            batch.delete(ref)
+        batch.commit(**SCHREIBEN)
+
+    rekorde = {}
+    anzahl = 0
+
+    for start in range(0, len(refs), blockgroesse):
+        batch = db.batch()
+        for doc in db.get_all(refs[start:start + blockgroesse], **LESEN):
+            if not doc.exists:
+                continue
+            daten = doc.to_dict()
+            zusammenfassung = erstelle_zusammenfassung(daten.get("spieler", []), daten.get("runden", []))
+            batch.set(
+                db.collection(ZUSAMMENFASSUNGEN).document(doc.id),
+                {**zusammenfassung, "aktualisiert": firestore.SERVER_TIMESTAMP}
+            )
+            for name, werte in zusammenfassung["spieler"].items():
+                ziel = rekorde.setdefault(name, {feld: 0 for feld in SUMMEN_FELDER} | {"max_punkte": 20.0})
+                for feld in SUMMEN_FELDER:
+                    ziel[feld] += werte[feld]
+                ziel["max_punkte"] = max(ziel["max_punkte"], werte["max_punkte"])
+            anzahl += 1
+        batch.commit(**SCHREIBEN)
+
+    db.collection(REKORDE_DOKUMENT[0]).document(REKORDE_DOKUMENT[1]).set({"spieler": rekorde}, **SCHREIBEN)
+    return anzahl
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Saison-Zusammenfassungen aller Vatertagsspiele neu aufbauen")
+    parser.add_argument("--credentials", required=True, help="Pfad zur Firebase Service-Account JSON-Datei")
+    args = parser.parse_args()
+
+    print(f"{backfill(get_firestore_client(args.credentials))} Spiele zusammengefasst.")
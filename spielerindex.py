@@ -0,0 +1,116 @@
+import threading
+from collections import Counter
+
+
+def _neue_spalten():
+    return {
+        "einsaetze": [],
+        "plaetze": [],
+        "gewinne": [],
+        "punkte": [],
+        "effizienz": [],
+        "bonus_runden": [],
+        "platz_verteilung": Counter(),
+        "direktvergleich": {},
+        "_einsatz_summe": 0,
+        "_gewinn_summe": 0.0,
+    }
+
+
+class SpielerIndex:
+    """
+    Spaltenweise Kennzahlen pro Spieler für die Detailansicht.
+
+    Wird einmal pro Spielversion aktualisiert: kommen nur Runden hinzu, werden
+    nur diese angehängt, sonst (Runde korrigiert, Spieler geändert) neu aufgebaut.
+    Eine Detailansicht liest danach nur noch die Spalten eines Spielers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self.runden_namen = []
+        self._spalten = {}
+        self._rundenschluessel = []
+
+    def aktualisiere(self, version, spieler_liste, runden_namen, bonus_empfaenger_pro_runde):
+        """
+        Bringt den Index auf den Stand einer Spielversion.
+
+        Args:
+            version: Spielversion (bei gleicher Version passiert nichts)
+            spieler_liste: Spieler aus berechne_punktestand
+            runden_namen: Namen aller Runden
+            bonus_empfaenger_pro_runde: Liste der Bonus-Empfänger pro Runde
+        """
+        with self._lock:
+            if version == self.version:
+                return
+            runden = [
+                {
+                    sp["name"]: (sp["einsaetze"][i], sp["plaetze"][i], sp["gewinne"][i])
+                    for sp in spieler_liste
+                }
+                for i in range(len(runden_namen))
+            ]
+
+            bekannt = len(self._rundenschluessel)
+            nur_angehaengt = (
+                set(self._spalten) == {sp["name"] for sp in spieler_liste}
+                and len(runden) >= bekannt
+                and runden[:bekannt] == self._rundenschluessel
+            )
+            if not nur_angehaengt:
+                self._spalten = {sp["name"]: _neue_spalten() for sp in spieler_liste}
+                self._rundenschluessel = []
+                bekannt = 0
+
+            for i in range(bekannt, len(runden)):
+                self._haenge_runde_an(i, runden[i], bonus_empfaenger_pro_runde[i] or [])
+            self.runden_namen = list(runden_namen)
+            self.version = version
+
+    def _haenge_runde_an(self, i, runde, bonus_empfaenger):
+        for name, (einsatz, platz, gewinn) in runde.items():
+            spalten = self._spalten[name]
+            spalten["_einsatz_summe"] += einsatz
+            spalten["_gewinn_summe"] += gewinn
+            spalten["einsaetze"].append(einsatz)
+            spalten["plaetze"].append(platz)
+            spalten["gewinne"].append(gewinn)
+            spalten["punkte"].append(20.0 + spalten["_gewinn_summe"])
+            spalten["effizienz"].append(
+                spalten["_gewinn_summe"] / spalten["_einsatz_summe"] if spalten["_einsatz_summe"] else 0.0
+            )
+            spalten["platz_verteilung"][platz] += 1
+            if name in bonus_empfaenger:
+                spalten["bonus_runden"].append(i)
+
+            # Direktvergleich: besserer (kleinerer) Platz gewinnt die Runde
+            for gegner, (_, gegner_platz, _) in runde.items():
+                if gegner == name:
+                    continue
+                bilanz = spalten["direktvergleich"].setdefault(gegner, [0, 0, 0])
+                bilanz[0 if platz < gegner_platz else 1 if platz > gegner_platz else 2] += 1
+
+        self._rundenschluessel.append(runde)
+
+    def ansicht(self, name):
+        """
+        Vorberechnete Spalten eines Spielers – eine Kopie, damit ein parallel
+        angehängter Rundenblock die Anzeige nicht mitten im Rendern verändert.
+
+        Returns:
+            dict: runden_namen, einsaetze, plaetze, gewinne, punkte, effizienz, bonus_runden,
+                  platz_verteilung, direktvergleich ({Gegner: [Siege, Niederlagen, Unentschieden]})
+        """
+        with self._lock:
+            spalten = self._spalten[name]
+            ansicht = {
+                schluessel: wert.copy()
+                for schluessel, wert in spalten.items()
+                if not schluessel.startswith("_")
+            }
+            ansicht["direktvergleich"] = {gegner: list(b) for gegner, b in spalten["direktvergleich"].items()}
+            ansicht["runden_namen"] = list(self.runden_namen)
+        return ansicht
@@ -0,0 +1,213 @@
+import argparse
+import io
+
+from firebase_admin import firestore
+import pandas as pd
+
+from firestore_client import get_firestore_client, LESEN, SCHREIBEN
+from saison import erstelle_zusammenfassung, aktualisiere_zusammenfassungen
+
+# Eine Zeile pro Runde × Spieler; Spieler ohne Runden (z. B. frisch angelegte Spiele) als Zeile mit runde_nr 0
+SPALTEN = ["spiel", "runde_nr", "runde", "spieler", "einsatz", "platz", "gewinn", "kumuliert", "bonus", "multiplikatoren"]
+
+# Firestore erlaubt max. 500 Schreibvorgänge pro Batch
+BATCH_GROESSE = 400
+# Wie viele Spiele get_all() beim Export auf einmal lädt
+LESE_BLOCKGROESSE = 100
+
+
+def spiel_zu_spalten(spielname, daten):
+    """
+    Wandelt ein gespeichertes Spiel in spaltenweise Listen um.
+
+    Args:
+        spielname: Name des Spiels
+        daten: Spieldokument aus "spiele/{name}"
+
+    Returns:
+        dict: Spaltenname -> Liste (Reihenfolge wie SPALTEN)
+    """
+    spalten = {name: [] for name in SPALTEN}
+    runden = daten.get("runden", [])
+    multiplikatoren = ",".join(f"{m:g}" for m in daten.get("multiplikatoren", []))
+
+    for sp in daten.get("spieler", []):
+        kumuliert = 20.0
+        if not sp.get("gewinne", [])[:len(runden)]:
+            # Keine Rundendaten – Spieler trotzdem sichern, sonst gehen angelegte Spiele verloren
+            for name, wert in zip(SPALTEN, [spielname, 0, "", sp["name"], 0, 0, 0.0, kumuliert, False, multiplikatoren]):
+                spalten[name].append(wert)
+        for i, gewinn in enumerate(sp.get("gewinne", [])[:len(runden)]):
+            kumuliert += gewinn
+            spalten["spiel"].append(spielname)
+            spalten["runde_nr"].append(i + 1)
+            spalten["runde"].append(runden[i]["name"])
+            spalten["spieler"].append(sp["name"])
+            spalten["einsatz"].append(int(sp["einsaetze"][i]))
+            spalten["platz"].append(int(sp["plaetze"][i]))
+            spalten["gewinn"].append(float(gewinn))
+            spalten["kumuliert"].append(kumuliert)
+            spalten["bonus"].append(sp["name"] in (runden[i].get("bonus_empfaenger") or []))
+            spalten["multiplikatoren"].append(multiplikatoren)
+
+    return spalten
+
+
+def exportiere(db, spielnamen=None):
+    """
+    Exportiert ein, mehrere oder alle Spiele als DataFrame.
+
+    Args:
+        db: Firestore Client
+        spielnamen: Liste von Spielnamen, None für alle Spiele
+
+    Returns:
+        pd.DataFrame: Eine Zeile pro Runde × Spieler
+    """
+    sammlung = db.collection("spiele")
+    if spielnamen is None:
+        refs = list(sammlung.list_documents())
+    else:
+        refs = [sammlung.document(name) for name in spielnamen]
+
+    spalten = {name: [] for name in SPALTEN}
+    for start in range(0, len(refs), LESE_BLOCKGROESSE):
+        for doc in db.get_all(refs[start:start + LESE_BLOCKGROESSE], **LESEN):
+            if not doc.exists:
+                continue
+            for name, werte in spiel_zu_spalten(doc.id, doc.to_dict()).items():
+                spalten[name].extend(werte)
+
+    return pd.DataFrame(spalten, columns=SPALTEN).sort_values(["spiel", "runde_nr"], kind="stable")
+
+
+def spalten_zu_spielen(df):
+    """
+    Baut aus exportierten Zeilen wieder Spieldokumente zusammen.
+
+    Returns:
+        dict: Spielname -> Spieldokument (Format wie streamlit_app.py)
+    """
+    spiele = {}
+    for spielname, gruppe in df.sort_values(["spiel", "runde_nr"], kind="stable").groupby("spiel", sort=False):
+        spieler_namen = list(dict.fromkeys(gruppe["spieler"]))
+        runden_nrn = [nr for nr in dict.fromkeys(gruppe["runde_nr"]) if nr != 0]
+        multiplikatoren = gruppe["multiplikatoren"].iloc[0]
+        multiplikatoren = "" if pd.isna(multiplikatoren) else str(multiplikatoren)
+
+        spieler = {name: {"name": name, "einsaetze": [], "plaetze": [], "gewinne": []} for name in spieler_namen}
+        runden = {nr: {"name": None, "einsaetze": {}, "plaetze": {}, "bonus_empfaenger": []} for nr in runden_nrn}
+
+        for zeile in gruppe.itertuples(index=False):
+            if zeile.runde_nr == 0:
+                continue  # Nur Spieler-Eintrag ohne Runde
+            runde = runden[zeile.runde_nr]
+            runde["name"] = str(zeile.runde)
+            runde["einsaetze"][zeile.spieler] = int(zeile.einsatz)
+            runde["plaetze"][zeile.spieler] = int(zeile.platz)
+            if bool(zeile.bonus):
+                runde["bonus_empfaenger"].append(zeile.spieler)
+
+            sp = spieler[zeile.spieler]
+            sp["einsaetze"].append(int(zeile.einsatz))
+            sp["plaetze"].append(int(zeile.platz))
+            sp["gewinne"].append(float(zeile.gewinn))
+
+        for sp in spieler.values():
+            sp["punkte"] = 20.0 + sum(sp["gewinne"])
+
+        spiele[spielname] = {
+            "spieler": list(spieler.values()),
+            "multiplikatoren": [float(m) for m in multiplikatoren.split(",") if m.strip()],
+            "runden": list(runden.values()),
+        }
+    return spiele
+
+
+def vorhandene_spiele(db, namen, blockgroesse=LESE_BLOCKGROESSE):
+    """Welche der Spielnamen es in "spiele" schon gibt (blockweise per get_all())."""
+    refs = [db.collection("spiele").document(name) for name in namen]
+    vorhanden = set()
+    for start in range(0, len(refs), blockgroesse):
+        vorhanden |= {doc.id for doc in db.get_all(refs[start:start + blockgroesse], **LESEN) if doc.exists}
+    return vorhanden
+
+
+def importiere(db, df, ueberschreiben=False, batch_groesse=BATCH_GROESSE):
+    """
+    Schreibt exportierte Spiele per Batched Writes zurück nach Firestore und
+    zieht ihre Saison-Zusammenfassungen blockweise nach.
+
+    Args:
+        db: Firestore Client
+        df: Export (siehe exportiere)
+        ueberschreiben: True = bestehende Spiele mit gleichem Namen ersetzen, sonst überspringen
+
+    Returns:
+        tuple: (Namen der importierten Spiele, Namen der übersprungenen Spiele)
+    """
+    spiele = spalten_zu_spielen(df)
+    uebersprungen = [] if ueberschreiben else sorted(vorhandene_spiele(db, list(spiele)))
+    namen = [name for name in spiele if name not in uebersprungen]
+    for start in range(0, len(namen), batch_groesse):
+        batch = db.batch()
+        for name in namen[start:start + batch_groesse]:
+            batch.set(db.collection("spiele").document(name), {
+                **spiele[name],
+                "zeitstempel": firestore.SERVER_TIMESTAMP
+            })
+        batch.commit(**SCHREIBEN)
+
+    aktualisiere_zusammenfassungen(db, {
+        name: erstelle_zusammenfassung(spiele[name]["spieler"], spiele[name]["runden"]) for name in namen
+    })
+    return namen, uebersprungen
+
+
+def als_bytes(df, format):
+    """Serialisiert den Export als 'parquet' oder 'csv' (z. B. für st.download_button)."""
+    puffer = io.BytesIO()
+    if format == "parquet":
+        df.to_parquet(puffer, index=False)
+    else:
+        df.to_csv(puffer, index=False)
+    return puffer.getvalue()
+
+
+def lese_datei(quelle, format):
+    """Liest einen Export aus Pfad oder Datei-Objekt ('parquet' oder 'csv')."""
+    if format == "parquet":
+        return pd.read_parquet(quelle)
+    return pd.read_csv(quelle)
+
+
+def _format(pfad):
+    return "parquet" if str(pfad).endswith(".parquet") else "csv"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vatertagsspiele als Parquet/CSV exportieren oder importieren")
+    parser.add_argument("--credentials", required=True, help="Pfad zur Firebase Service-Account JSON-Datei")
+    unter = parser.add_subparsers(dest="befehl", required=True)
+
+    export_parser = unter.add_parser("export", help="Spiele exportieren")
+    export_parser.add_argument("datei", help="Zieldatei (.parquet oder .csv)")
+    export_parser.add_argument("--spiel", action="append", help="Spielname (mehrfach möglich, Standard: alle)")
+
+    import_parser = unter.add_parser("import", help="Spiele importieren")
+    import_parser.add_argument("datei", help="Quelldatei (.parquet oder .csv)")
+    import_parser.add_argument("--ueberschreiben", action="store_true", help="Bestehende Spiele mit gleichem Namen ersetzen")
+
+    args = parser.parse_args()
+    db = get_firestore_client(args.credentials)
+
+    if args.befehl == "export":
+        df = exportiere(db, args.spiel)
+        with open(args.datei, "wb") as f:
+            f.write(als_bytes(df, _format(args.datei)))
+        print(f"{df['spiel'].nunique()} Spiele ({len(df)} Zeilen) nach {args.datei} exportiert.")
+    else:
+        namen, uebersprungen = importiere(db, lese_datei(args.datei, _format(args.datei)), args.ueberschreiben)
+        print(f"{len(namen)} Spiele importiert: {', '.join(namen)}")
+        if uebersprungen:
+            print(f"{len(uebersprungen)} bestehende Spiele übersprungen (--ueberschreiben zum Ersetzen): {', '.join(uebersprungen)}")
@@ -1,6 +1,4 @@
 import streamlit as st
-import firebase_admin
-from firebase_admin import credentials, firestore
 import json
 import pandas as pd
 import altair as alt
@@ -10,110 +8,131 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 import streamlit.components.v1 as components
 import re
+from prognose import simuliere_endstand, anzahl_simulationen
+from firestore_client import get_firestore_client, LESEN
+from messung import messe, setze
+from kommentar_llm import KommentarDienst, OpenAIClient, StubClient, erstelle_prompt, rundenversion
+from geteilter_cache import geteilt
+from cache_politik import begrenzt
+from aktualisierung import Taktgeber, MAX_MS, SCHNELL_MS, zeitfenster, spielversion
+from hintergrund_lader import HintergrundLader
+from verlauf_chart import verlauf_daten, verlauf_chart
+from rangliste import Spielverlauf
+from spielerindex import SpielerIndex
+from diagnose import starte_diagnose, zeige_diagnose, diagnose_aktiv, stoppe
 
 st.set_page_config(page_title="📺 Live Spielstand", layout="wide")
 
-# Auto-Refresh alle 1 Minuten (60.000 Millisekunden)
-streamlit_autorefresh.st_autorefresh(interval=60_000, key="refresh")
+# 🩺 Metrik-Server / cProfile (opt-in)
+profiler = starte_diagnose()
 
 # 🔒 Fester Spielname – HIER ANPASSEN!
 FESTER_SPIELNAME = "Vatertagsspiele 2026"
 
-# Firebase verbinden (GECACHT - wird nur einmal ausgeführt)
-@st.cache_resource
-def get_firestore_client():
-    """Initialisiert Firebase Client und cached die Instanz."""
-    if not firebase_admin._apps:
-        cred_dict = json.loads(st.secrets["firebase_service_account"])
-        cred = credentials.Certificate(cred_dict)
-        firebase_admin.initialize_app(cred)
-    return firestore.client()
+# Geplante Rundenzahl für die Prognose (kann im Spieldokument über "geplante_runden" überschrieben werden)
+GEPLANTE_RUNDEN = 12
+
+# Ab so vielen Runden zeigt das Verlaufsdiagramm standardmäßig den skalierbaren Modus
+SKALIERBAR_AB_RUNDEN = 30
+
+# So oft (Sekunden) prüft eine Sitzung, ob ihr Hintergrund-Refresh fertig ist – nur solange einer läuft
+LADER_PRUEFUNG_S = 2
 
+# Kommentar-Modus: "vorlage" (Standard), "llm" (OpenAI/kompatibler Server) oder "stub" (deterministisch)
+KOMMENTAR_MODUS = st.secrets.get("kommentar_modus", "vorlage")
+
+# Firebase verbinden (prozessweit geteilter Client)
 db = get_firestore_client()
 
-# 🚀 NEUE FUNKTION: Spieldaten aus Firebase laden (GECACHT!)
-@st.cache_data(ttl=300)  # Cache für 5 Minuten
-def lade_spieldaten(spielname):
+# LLM-Kommentare (GECACHT - ein Hintergrund-Worker pro Prozess)
+@st.cache_resource
+def get_kommentar_dienst():
+    """Erstellt den Kommentar-Dienst mit dem konfigurierten Client."""
+    if KOMMENTAR_MODUS == "stub":
+        client = StubClient()
+    else:
+        llm = st.secrets.get("llm", {})
+        client = OpenAIClient(
+            modell=llm.get("modell", "gpt-4o-mini"),
+            base_url=llm.get("base_url"),
+            api_key=llm.get("api_key"),
+        )
+    return KommentarDienst(client, db)
+
+# 🚀 NEUE FUNKTION: Spieldaten aus Firebase laden (über get_spiel_lader GECACHT!)
+@geteilt(ttl=300)  # Über alle Replikas geteilt: nur eine liest Firestore
+def lade_spieldaten(spielname, fenster):
     """
-    Lädt Spieldaten aus Firebase und cached sie für 5 Minuten.
+    Lädt Spieldaten aus Firebase.
     
     Args:
         spielname: Name des Spiels
+        fenster: Abfragefenster – höchstens ein Firestore-Zugriff pro Fenster
         
     Returns:
         dict: Spieldaten oder None bei Fehler
     """
-    spiel_doc = db.collection("spiele").document(spielname).get()
+    with messe("firestore.get"):
+        spiel_doc = db.collection("spiele").document(spielname).get(**LESEN)
     if not spiel_doc.exists:
         return None
     return spiel_doc.to_dict()
 
+# Spaltenweise Kennzahlen pro Spieler (GECACHT - ein Index pro Spiel und Prozess)
+@st.cache_resource
+def get_spieler_index(spielname):
+    """Index für die Detailansicht; wird pro Spielversion inkrementell aktualisiert."""
+    return SpielerIndex()
+
+# Stale-while-revalidate (GECACHT - ein Lader pro Prozess)
+@st.cache_resource
+def get_spiel_lader():
+    """
+    Liefert sofort den letzten guten Stand; ist er älter als ein Abfrageintervall,
+    lädt ein Hintergrund-Thread neu. Reruns warten so nie auf Firestore.
+    """
+    return HintergrundLader(lambda spielname: lade_spieldaten(spielname, zeitfenster()), weich_ttl=SCHNELL_MS / 1000)
+
+# Rangliste über Reruns hinweg (GECACHT - ein Verlauf pro Spiel und Prozess)
+@st.cache_resource
+def get_spielverlauf(spielname):
+    """Spielverlauf, der pro Aufruf nur neue oder geänderte Runden nachrechnet."""
+    return Spielverlauf()
+
 # 🚀 NEUE FUNKTION: Punkte berechnen (GECACHT!)
-@st.cache_data(ttl=300)
-def berechne_punktestand(spieler_liste, runden_liste, multiplikatoren_liste):
+@begrenzt(max_eintraege=4, ttl=300)
+@geteilt(ttl=3600, abhaengig_von=("rangliste",))
+def berechne_punktestand(spielname, spieler_liste, runden_liste, multiplikatoren_liste):
     """
     Berechnet Punktestand, Verlauf und Bonus-Empfänger.
-    Wird nur bei Änderungen neu berechnet!
+    Wird nur bei Änderungen neu berechnet – und dann nur ab der ersten geänderten Runde!
     
     Args:
+        spielname: Name des Spiels (wählt den Spielverlauf)
         spieler_liste: Liste der Spieler
         runden_liste: Liste der Runden
         multiplikatoren_liste: Multiplikatoren für Plätze
         
     Returns:
-        tuple: (spieler, punkteverlauf, bonus_empfaenger_pro_runde)
+        tuple: (spieler nach Rang sortiert mit "rang"/"trend", punkteverlauf, bonus_empfaenger_pro_runde)
     """
-    # Deep copy um Original nicht zu verändern
-    spieler = [sp.copy() for sp in spieler_liste]
-    
-    # Initialisierung
-    for sp in spieler:
-        sp["einsaetze"], sp["plaetze"], sp["gewinne"] = [], [], []
-        sp["punkte"] = 20.0
-
-    punkteverlauf = []
-    zwischenpunkte = {sp["name"]: 20.0 for sp in spieler}
-    bonus_empfaenger_pro_runde = []
-
-    # Startrunde hinzufügen
-    for sp_name in zwischenpunkte:
-        punkteverlauf.append({
-            "Runde": "0: Start",
-            "Spieler": sp_name,
-            "Punkte": 20.0
-        })
-
-    # Runden durchgehen
-    for i, runde in enumerate(runden_liste):
-        letzter_spieler = min(zwischenpunkte, key=zwischenpunkte.get)
-        bonus_empfaenger_pro_runde.append(letzter_spieler)
-
-        for sp in spieler:
-            einsatz = runde["einsaetze"].get(sp["name"], 0)
-            platz = runde["plaetze"].get(sp["name"], 1)
-            multiplikator = multiplikatoren_liste[platz - 1] if platz - 1 < len(multiplikatoren_liste) else 0
-            gewinn = einsatz * multiplikator
-
-            # Rubber-Banding
-            if sp["name"] == letzter_spieler and gewinn < 0:
-                gewinn = 0
-
-            sp["einsaetze"].append(einsatz)
-            sp["plaetze"].append(platz)
-            sp["gewinne"].append(gewinn)
-            sp["punkte"] += gewinn
-            zwischenpunkte[sp["name"]] += gewinn
-            
-            punkteverlauf.append({
-                "Runde": f"{i+1}: {runde['name']}",
-                "Spieler": sp["name"],
-                "Punkte": zwischenpunkte[sp["name"]]
-            })
+    verlauf = get_spielverlauf(spielname)
+    spieler, bonus_empfaenger_pro_runde = verlauf.aktualisiere(
+        None, [sp["name"] for sp in spieler_liste], runden_liste, multiplikatoren_liste
+    )
+
+    # Punkteverlauf in Spielreihenfolge, beginnend mit der Startrunde
+    nach_name = {sp["name"]: sp for sp in spieler}
+    runden_titel = ["0: Start"] + [f"{i+1}: {runde['name']}" for i, runde in enumerate(runden_liste)]
+    punkteverlauf = [
+        {"Runde": titel, "Spieler": sp["name"], "Punkte": nach_name[sp["name"]]["verlauf"][i]}
+        for i, titel in enumerate(runden_titel)
+        for sp in spieler_liste
+    ]
 
     return spieler, punkteverlauf, bonus_empfaenger_pro_runde
 
-# 🚀 NEUE FUNKTION: Kommentare generieren (GECACHT!)
-@st.cache_data(ttl=300)
+# 🚀 NEUE FUNKTION: Kommentare generieren (über generiere_kommentar_cached GECACHT!)
 def generiere_kommentar(spieler_liste, runden_liste, bonus_empfaenger_pro_runde):
     """
     Generiert Spielkommentar basierend auf aktuellem Spielstand.
@@ -219,7 +238,7 @@ def generiere_kommentar(spieler_liste, runden_liste, bonus_empfaenger_pro_runde)
     # Kommentar zusammenbauen
     kommentar_text = ""
     
-    if bonus_empfaenger and rundensieger[0] == bonus_empfaenger:
+    if bonus_empfaenger and rundensieger[0] in bonus_empfaenger:
         kommentar_text += random.choice(kommentare_bonus_gewinnt).format(
             name=rundensieger[0], gewinn=rundensieger[1]
         ) + "\n"
@@ -237,12 +256,13 @@ def generiere_kommentar(spieler_liste, runden_liste, bonus_empfaenger_pro_runde)
     ) + "\n"
     
     if bonus_empfaenger:
-        kommentar_text += random.choice(kommentare_bonus).format(name=bonus_empfaenger)
+        kommentar_text += random.choice(kommentare_bonus).format(name=", ".join(bonus_empfaenger))
 
     return kommentar_text
 
 # 🚀 NEUE FUNKTION: Statistiken berechnen (GECACHT!)
-@st.cache_data(ttl=300)
+@begrenzt(max_eintraege=4, ttl=300)
+@geteilt(ttl=3600)
 def berechne_statistiken(spieler_liste, bonus_empfaenger_pro_runde, punkteverlauf_liste):
     """
     Berechnet alle Spielstatistiken.
@@ -274,7 +294,7 @@ def berechne_statistiken(spieler_liste, bonus_empfaenger_pro_runde, punkteverlau
     stats["max_punkte_runde"] = max_row["Runde"]
 
     # 3. Häufigster Bonus-Empfänger
-    bonus_daten = bonus_empfaenger_pro_runde[1:]
+    bonus_daten = [name for namen in bonus_empfaenger_pro_runde[1:] for name in namen]
     if bonus_daten:
         bonus_counter = pd.Series(bonus_daten).value_counts()
         stats["haeufigster_bonus_spieler"] = bonus_counter.idxmax()
@@ -310,11 +330,11 @@ def berechne_statistiken(spieler_liste, bonus_empfaenger_pro_runde, punkteverlau
 
     # 7. Bonus-Effizienz
     bonus_sieger = {}
-    for i, bonus_empf in enumerate(bonus_empfaenger_pro_runde[1:], start=1):
+    for i, bonus_namen in enumerate(bonus_empfaenger_pro_runde[1:], start=1):
         if i < len(spieler_liste[0]["gewinne"]):
             rundensieger = max(spieler_liste, key=lambda sp: sp["gewinne"][i])
-            if bonus_empf == rundensieger["name"]:
-                bonus_sieger[bonus_empf] = bonus_sieger.get(bonus_empf, 0) + 1
+            if rundensieger["name"] in bonus_namen:
+                bonus_sieger[rundensieger["name"]] = bonus_sieger.get(rundensieger["name"], 0) + 1
 
     if bonus_sieger:
         stats["bester_bonusnutzer"] = max(bonus_sieger, key=bonus_sieger.get)
@@ -329,33 +349,98 @@ def berechne_statistiken(spieler_liste, bonus_empfaenger_pro_runde, punkteverlau
 
     return stats
 
+# 🚀 NEUE FUNKTION: Endstand-Prognose (GECACHT!)
+@begrenzt(max_eintraege=4, ttl=300)
+@geteilt(ttl=3600, abhaengig_von=("prognose",))
+def berechne_prognose(namen, punkte, multiplikatoren_liste, restrunden):
+    """
+    Simuliert die restlichen Runden bis zu 100.000-mal (NumPy, vektorisiert; weniger bei vielen Spielern und Runden).
+    Wird nur bei neuem Punktestand neu berechnet!
+
+    Returns:
+        list: Siegchance und Ausgeschieden-Flag pro Spieler
+    """
+    return simuliere_endstand(namen, punkte, multiplikatoren_liste, restrunden)
+
+# 🚀 NEUE FUNKTION: Verlaufsdaten für das skalierbare Diagramm (GECACHT!)
+@begrenzt(max_eintraege=4, ttl=300)
+def berechne_verlauf(spieler_liste, runden_namen, top_n):
+    """
+    Downsampling (LTTB) pro Spieler und feste Achsen-Domains.
+    Wird nur bei Änderungen neu berechnet!
+
+    Returns:
+        tuple: (DataFrame, Domains)
+    """
+    return verlauf_daten(spieler_liste, runden_namen, top_n=top_n or None)
+
 
 # ==================== HAUPTPROGRAMM ====================
 
 st.title("🎲 Vatertagsspiele 2026 - Spielstand (live)")
 
-# Spiel laden (GECACHT!)
-daten = lade_spieldaten(FESTER_SPIELNAME)
+# Spiel laden (GECACHT! Letzter guter Stand, Aktualisierung im Hintergrund)
+with messe("laden"):
+    daten, frische = get_spiel_lader().hole(FESTER_SPIELNAME)
+if frische["fehler"]:
+    st.warning(f"⚠️ Verbindung gestört – Stand von vor {frische['alter_s']:.0f} s ({frische['fehler']})")
+else:
+    st.caption(f"🟢 Stand von vor {frische['alter_s']:.0f} s")
+
+# 🔄 Läuft gerade ein Hintergrund-Refresh, einmal neu zeichnen, sobald er fertig ist (prüft nur den Speicher).
+# Sonst wird nicht gepollt – dann gilt allein das Intervall des Taktgebers.
+if frische["laedt"]:
+    @st.fragment(run_every=LADER_PRUEFUNG_S)
+    def beobachte_lader():
+        if not get_spiel_lader().laedt(FESTER_SPIELNAME):
+            st.rerun()
+
+    beobachte_lader()
+
 if not daten:
     st.error(f"Spiel '{FESTER_SPIELNAME}' nicht gefunden.")
-    st.stop()
+    streamlit_autorefresh.st_autorefresh(interval=MAX_MS, key="refresh")
+    stoppe()
+
+# Auto-Refresh passt sich der Aktivität an: schnell nach Änderungen, im Leerlauf immer seltener
+if "taktgeber" not in st.session_state:
+    st.session_state.taktgeber = Taktgeber()
+st.session_state.taktgeber.beobachte(spielversion(daten))
+streamlit_autorefresh.st_autorefresh(
+    interval=st.session_state.taktgeber.intervall(daten.get("aktualisierung_ms")),
+    key="refresh"
+)
 
 # Punkte berechnen (GECACHT!)
-spieler, punkteverlauf, bonus_empfaenger_pro_runde = berechne_punktestand(
-    daten["spieler"], 
-    daten["runden"], 
-    daten["multiplikatoren"]
-)
+with messe("punktestand"):
+    spieler, punkteverlauf, bonus_empfaenger_pro_runde = berechne_punktestand(
+        FESTER_SPIELNAME,
+        daten["spieler"], 
+        daten["runden"], 
+        daten["multiplikatoren"]
+    )
 
 # Kommentar generieren (GECACHT!)
-@st.cache_data(ttl=300, show_spinner=False)
+@begrenzt(max_eintraege=4, ttl=300)
+@geteilt(ttl=3600)  # Alle Bildschirme zeigen denselben Zufallskommentar
 def generiere_kommentar_cached(spieler_liste, runden_liste, bonus_empfaenger_pro_runde):
     # Wir erzeugen einen Hash/Key basierend auf dem Punktestand der aktuellen Runde
     aktuelle_punkte = tuple(sp["punkte"] for sp in spieler_liste)
     # Der Cache nutzt den Key automatisch über die Funktionseingaben
     return generiere_kommentar(spieler_liste, runden_liste, bonus_empfaenger_pro_runde)
     
-kommentar = generiere_kommentar_cached(spieler, daten["runden"], bonus_empfaenger_pro_runde)
+with messe("kommentar"):
+    kommentar = generiere_kommentar_cached(spieler, daten["runden"], bonus_empfaenger_pro_runde)
+
+# LLM-Kommentar nur, wenn er schon fertig ist – sonst bleibt es bei der Vorlage
+if KOMMENTAR_MODUS in ("llm", "stub") and daten["runden"]:
+    llm_kommentar = get_kommentar_dienst().kommentar(
+        FESTER_SPIELNAME,
+        rundenversion(spieler, daten["runden"]),
+        erstelle_prompt(spieler, bonus_empfaenger_pro_runde[-1] if len(daten["runden"]) > 1 else None)
+    )
+    if llm_kommentar:
+        kommentar = llm_kommentar
 
 #Sprachausgabe des Kommentars
 kommentar_clean = re.sub(r"\*+", "", kommentar)
@@ -403,23 +488,27 @@ components.html(
 )
 
 # Statistiken berechnen (GECACHT!)
-stats = berechne_statistiken(spieler, bonus_empfaenger_pro_runde, punkteverlauf)
+with messe("statistiken"):
+    stats = berechne_statistiken(spieler, bonus_empfaenger_pro_runde, punkteverlauf)
 
 # ==================== ANZEIGE ====================
 
 # Punktetabelle
 st.subheader("📊 Aktueller Punktestand")
-tabelle = []
-for sp in sorted(spieler, key=lambda x: -x["punkte"]):
-    zeile = {"Spieler": sp["name"], "Punkte": round(sp["punkte"], 1)}
-    for i, runde in reversed(list(enumerate(daten["runden"]))):
-    #for i, runde in enumerate(daten["runden"]):
-        bonus = "★" if i > 0 and sp["name"] == bonus_empfaenger_pro_runde[i] else ""
-        zeile[runde["name"]] = f"E: {sp['einsaetze'][i]} | P: {sp['plaetze'][i]} | +{round(sp['gewinne'][i],1)}{bonus}"
-    tabelle.append(zeile)
-
-df = pd.DataFrame(tabelle)
-st.dataframe(df, use_container_width=True, hide_index=True)
+with messe("tabelle"):
+    tabelle = []
+    for sp in spieler:  # bereits nach Rang sortiert
+        zeile = {"Platz": sp["rang"], "Trend": sp["trend"], "Spieler": sp["name"], "Punkte": round(sp["punkte"], 1)}
+        for i, runde in reversed(list(enumerate(daten["runden"]))):
+        #for i, runde in enumerate(daten["runden"]):
+            bonus = "★" if sp["name"] in bonus_empfaenger_pro_runde[i] else ""
+            zeile[runde["name"]] = f"E: {sp['einsaetze'][i]} | P: {sp['plaetze'][i]} | +{round(sp['gewinne'][i],1)}{bonus}"
+        tabelle.append(zeile)
+
+    df = pd.DataFrame(tabelle)
+
+with messe("arrow.tabelle"):
+    st.dataframe(df, use_container_width=True, hide_index=True)
 
 # Kommentar
 st.subheader("💬 Spielkommentar")
@@ -429,16 +518,39 @@ for zeile in kommentar.split("\n"):
 
 # Verlaufsgrafik
 st.subheader("📈 Punkteverlauf")
-df_chart = pd.DataFrame(punkteverlauf)
+col_modus, col_top = st.columns([0.3, 0.2])
+with col_modus:
+    skalierbar = st.toggle(
+        "Skalierbarer Modus (für viele Runden)",
+        value=len(daten["runden"]) >= SKALIERBAR_AB_RUNDEN
+    )
+with col_top:
+    top_n = st.number_input("Nur Top-N Spieler (0 = alle)", min_value=0, step=1, value=0, disabled=not skalierbar)
+
+with messe("chart"):
+    if skalierbar:
+        df_chart, domains = berechne_verlauf(
+            [{"name": sp["name"], "gewinne": sp["gewinne"]} for sp in spieler],
+            [r["name"] for r in daten["runden"]],
+            int(top_n)
+        )
+        chart = verlauf_chart(df_chart, domains)
+    else:
+        df_chart = pd.DataFrame(punkteverlauf)
+
+        chart = alt.Chart(df_chart).mark_line(point=True).encode(
+            x="Runde",
+            y=alt.Y("Punkte", scale=alt.Scale(zero=False)),
+            color="Spieler",
+            tooltip=["Spieler", "Runde", "Punkte"]
+        ).properties(height=400)
 
-chart = alt.Chart(df_chart).mark_line(point=True).encode(
-    x="Runde",
-    y=alt.Y("Punkte", scale=alt.Scale(zero=False)),
-    color="Spieler",
-    tooltip=["Spieler", "Runde", "Punkte"]
-).properties(height=400)
+# Spec-Größe nur im Diagnosemodus messen (to_json kostet selbst Zeit)
+if diagnose_aktiv():
+    setze("altair_spec_bytes", len(chart.to_json()))
 
-st.altair_chart(chart, use_container_width=True)
+with messe("altair.chart"):
+    st.altair_chart(chart, use_container_width=True)
 
 # Statistiken
 st.subheader("📌 Spielstatistiken")
@@ -485,3 +597,90 @@ with col8:
               f"±{stats['spannungsindex']:.2f}", 
               "Punkte-Streuung")
 
+# Prognose
+st.subheader("🔮 Prognose Endstand")
+
+geplante_runden = daten.get("geplante_runden", GEPLANTE_RUNDEN)
+restrunden = max(geplante_runden - len(daten["runden"]), 0)
+with messe("prognose"):
+    prognose = berechne_prognose(
+        tuple(sp["name"] for sp in spieler),
+        tuple(sp["punkte"] for sp in spieler),
+        tuple(daten["multiplikatoren"]),
+        restrunden
+    )
+
+simulationen = anzahl_simulationen(len(spieler), restrunden) if restrunden else 1
+st.caption(
+    f"{restrunden} von {geplante_runden} Runden verbleibend – "
+    f"{simulationen:,} simulierte Spielverläufe".replace(",", ".")
+)
+df_prognose = pd.DataFrame([
+    {
+        "Spieler": p["name"],
+        "Siegchance": f"{p['siegchance'] * 100:.1f} %",
+        "Status": "❌ rechnerisch raus" if p["ausgeschieden"] else "✅ noch im Rennen"
+    }
+    for p in sorted(prognose, key=lambda x: -x["siegchance"])
+])
+st.dataframe(df_prognose, use_container_width=True, hide_index=True)
+
+# Spieler im Detail
+st.subheader("🔍 Spieler im Detail")
+with messe("spielerindex"):
+    spieler_index = get_spieler_index(FESTER_SPIELNAME)
+    spieler_index.aktualisiere(
+        spielversion(daten), spieler, [r["name"] for r in daten["runden"]], bonus_empfaenger_pro_runde
+    )
+
+namen = [sp["name"] for sp in spieler]
+gewaehlt = st.selectbox(
+    "Spieler auswählen",
+    namen,
+    index=namen.index(st.query_params["spieler"]) if st.query_params.get("spieler") in namen else 0,
+)
+st.query_params["spieler"] = gewaehlt  # Direktlink auf die Detailansicht
+
+if daten["runden"]:
+    with messe("spielerdetail"):
+        ansicht = spieler_index.ansicht(gewaehlt)
+        sp = next(sp for sp in spieler if sp["name"] == gewaehlt)
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            # Numerisches Delta: Streamlit färbt nur negative Werte rot (▼-Text wäre grün)
+            st.metric("🏅 Platz", sp["rang"], sp["rang_delta"] or None)
+        with col2:
+            st.metric("💰 Punkte", f"{ansicht['punkte'][-1]:.1f}")
+        with col3:
+            st.metric("📈 Effizienz", f"{ansicht['effizienz'][-1]:.2f}", "Gewinn/Einsatz")
+        with col4:
+            st.metric("🎁 Rubber-Banding", f"{len(ansicht['bonus_runden'])}×")
+
+        verlauf = pd.DataFrame(
+            {"Einsatz": ansicht["einsaetze"], "Effizienz": ansicht["effizienz"]},
+            index=pd.Index(ansicht["runden_namen"], name="Runde")
+        )
+        col_links, col_rechts = st.columns(2)
+        with col_links:
+            st.caption("Einsätze pro Runde")
+            st.bar_chart(verlauf["Einsatz"])
+        with col_rechts:
+            st.caption("Effizienz (kumuliert)")
+            st.line_chart(verlauf["Effizienz"])
+
+        col_links, col_rechts = st.columns(2)
+        with col_links:
+            st.caption("Platzverteilung")
+            st.bar_chart(pd.Series(ansicht["platz_verteilung"], name="Anzahl").sort_index().rename_axis("Platz"))
+            if ansicht["bonus_runden"]:
+                st.caption("Bonus-Runden: " + ", ".join(ansicht["runden_namen"][i] for i in ansicht["bonus_runden"]))
+        with col_rechts:
+            st.caption("Direktvergleich (besserer Platz pro Runde)")
+            st.dataframe(pd.DataFrame([
+                {"Gegner": gegner, "Siege": s, "Niederlagen": n, "Unentschieden": u}
+                for gegner, (s, n, u) in ansicht["direktvergleich"].items()
+            ]), use_container_width=True, hide_index=True)
+
+# Versteckte Diagnoseseite (?diagnose=1, optional ?profil=1)
+zeige_diagnose(profiler)
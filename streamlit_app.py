@@ -1,25 +1,181 @@
 import streamlit as st
-import firebase_admin
-from firebase_admin import credentials, firestore
-import json
+from firebase_admin import firestore
 import pandas as pd
 import uuid
-
-def get_firestore_client():
-    # Prüfen, ob eine Firebase-App bereits initialisiert wurde
-    if not firebase_admin._apps:
-        # Aus st.secrets laden (secrets.toml oder Streamlit Cloud)
-        cred_dict = json.loads(st.secrets["firebase_service_account"])
-        cred = credentials.Certificate(cred_dict)
-        firebase_admin.initialize_app(cred)
-
-    # Firestore-Client zurückgeben
-    return firestore.client()
-
+import importlib.util
+import time
+import copy
+from google.api_core.exceptions import FailedPrecondition
+from firestore_client import get_firestore_client, LESEN, SCHREIBEN
+from saison import erstelle_zusammenfassung, aktualisiere_zusammenfassung
+from spielexport import exportiere, importiere, als_bytes, lese_datei
+from messung import messe, erfasse
+from diagnose import starte_diagnose, zeige_diagnose, stoppe, starte_neu
+from rangliste import Spielverlauf
+
+# Prozessweit geteilter Client (kein neuer Kanal pro Rerun)
 db = get_firestore_client()
 
+# Wie oft ein Commit nach Konflikt neu aufgesetzt wird
+MAX_COMMIT_VERSUCHE = 5
+
+def berechne_spielstand(spieler, runden, multiplikatoren, verlauf=None):
+    """
+    Überträgt Einsätze, Plätze, Gewinne und Bonus-Empfänger aller Runden in spieler und runden.
+    Verändert spieler und runden direkt.
+
+    Args:
+        verlauf: Spielverlauf der Sitzung – rechnet nur Runden ab der ersten Änderung neu
+                 (None = einmalig komplett rechnen, z. B. nach einem Rebase)
+
+    Returns:
+        tuple: (Bonus-Empfänger pro Runde, Spieler in Ranglistenreihenfolge mit "rang"/"trend")
+    """
+    if verlauf is None:
+        verlauf = Spielverlauf()
+    stand, bonus_empfaenger_pro_runde = verlauf.aktualisiere(
+        None, [sp["name"] for sp in spieler], runden, multiplikatoren
+    )
+
+    nach_name = {eintrag["name"]: eintrag for eintrag in stand}
+    for sp in spieler:
+        eintrag = nach_name[sp["name"]]
+        sp["einsaetze"], sp["plaetze"], sp["gewinne"] = eintrag["einsaetze"], eintrag["plaetze"], eintrag["gewinne"]
+        sp["punkte"] = eintrag["punkte"]
+
+    # Bonus im Rundenobjekt speichern
+    for runde, bonus_empfaenger in zip(runden, bonus_empfaenger_pro_runde):
+        runde["bonus_empfaenger"] = bonus_empfaenger
+
+    return bonus_empfaenger_pro_runde, stand
+
+def runden_aenderungen(basis, runden):
+    """
+    Vergleicht die eigenen Runden mit dem zuletzt gespeicherten Stand.
+
+    Returns:
+        list: (runde_idx, feld, spieler, alter_wert, neuer_wert) pro geändertem Feld;
+              neue Runden erscheinen mit feld "neu"
+    """
+    aenderungen = []
+    for i, runde in enumerate(runden):
+        if i >= len(basis):
+            aenderungen.append((i, "neu", None, None, {"name": runde["name"], "einsaetze": {}, "plaetze": {}}))
+            alt = {"name": None, "einsaetze": {}, "plaetze": {}}
+        else:
+            alt = basis[i]
+        if runde["name"] != alt["name"]:
+            aenderungen.append((i, "name", None, alt["name"], runde["name"]))
+        for feld in ("einsaetze", "plaetze"):
+            for name, wert in runde[feld].items():
+                if alt[feld].get(name) != wert:
+                    aenderungen.append((i, feld, name, alt[feld].get(name), wert))
+    return aenderungen
+
+def rebase_runden(server_runden, aenderungen):
+    """
+    Spielt die eigenen Feldänderungen auf den aktuellen Serverstand auf.
+    Eigene neue Runden werden hinter die Serverrunden gehängt, auch wenn ihr Index
+    inzwischen belegt ist. Felder bestehender Runden, die jemand anders inzwischen
+    anders gesetzt hat, werden als Konflikt gemeldet (die eigene Eingabe gewinnt).
+
+    Returns:
+        tuple: (runden, konflikte)
+    """
+    runden = copy.deepcopy(server_runden)
+    konflikte = []
+    # Eigene neue Runden landen hinter allen Serverrunden: lokaler Index → Index auf dem Server
+    neuer_index = {}
+    for i, feld, name, alt, neu in aenderungen:
+        if feld == "neu":
+            # Ein anderer Scorer hat parallel eine Runde angelegt → eigene zusätzlich anhängen, nicht überschreiben
+            neuer_index[i] = len(runden)
+            runden.append(copy.deepcopy(neu))
+            continue
+        runde = runden[neuer_index.get(i, i)]
+        aktuell = runde["name"] if feld == "name" else runde[feld].get(name)
+        if aktuell not in (alt, neu):
+            konflikte.append(f"{runde['name']}: {feld}{f' {name}' if name else ''} ({aktuell} → {neu})")
+        if feld == "name":
+            runde["name"] = neu
+        else:
+            runde[feld][name] = neu
+    return runden, konflikte
+
+def geaenderte_felder(basis_runden, basis_spieler, runden, spieler):
+    """
+    Baut das update() nur aus den Feldern, die sich gegenüber dem Serverstand geändert haben.
+    Firestore kann Array-Elemente nicht per Feldpfad adressieren – kleiner als ein
+    ganzes Feld geht es daher nicht; eine reine Umbenennung schreibt z. B. "spieler" nicht mit.
+
+    Returns:
+        dict: Feldpfad → neuer Wert (immer inkl. "zeitstempel")
+    """
+    felder = {"zeitstempel": firestore.SERVER_TIMESTAMP}
+    if runden != basis_runden:
+        felder["runden"] = runden
+    if spieler != basis_spieler:
+        felder["spieler"] = spieler
+    return felder
+
+def committe_runden(spielname):
+    """
+    Speichert nur bei echten Änderungen – mit update_time-Vorbedingung statt blindem set().
+    Geschrieben werden nur die geänderten Felder (siehe geaenderte_felder).
+    Bei Konflikt wird auf den Serverstand neu aufgesetzt und erneut versucht.
+
+    Returns:
+        tuple: (gespeichert, rebased, konflikte)
+    """
+    aenderungen = runden_aenderungen(st.session_state.get("basis_runden", []), st.session_state.runden)
+    if not aenderungen:
+        return False, False, []
+
+    ref = db.collection("spiele").document(spielname)
+    runden = st.session_state.runden
+    spieler = st.session_state.spieler
+    basis_zeit = st.session_state.get("basis_zeit")
+    basis_runden = st.session_state.get("basis_runden", [])
+    basis_spieler = st.session_state.get("basis_spieler")
+    rebased = False
+    konflikte = []
+
+    for _ in range(MAX_COMMIT_VERSUCHE):
+        option = db.write_option(last_update_time=basis_zeit) if basis_zeit else None
+        try:
+            with messe("firestore.update"):
+                ergebnis = ref.update(
+                    geaenderte_felder(basis_runden, basis_spieler, runden, spieler),
+                    option=option, **SCHREIBEN
+                )
+        except FailedPrecondition:
+            # Jemand anders hat gespeichert → Serverstand holen und eigene Änderungen neu aufspielen
+            with messe("firestore.get"):
+                snap = ref.get(**LESEN)
+            server = snap.to_dict()
+            basis_runden, basis_spieler = server["runden"], server.get("spieler")
+            runden, neue_konflikte = rebase_runden(basis_runden, aenderungen)
+            konflikte += neue_konflikte
+            spieler = copy.deepcopy(st.session_state.spieler)
+            berechne_spielstand(spieler, runden, st.session_state.multiplikatoren)
+            basis_zeit = snap.update_time
+            rebased = True
+            continue
+
+        st.session_state.runden = runden
+        st.session_state.spieler = spieler
+        st.session_state.basis_runden = copy.deepcopy(runden)
+        st.session_state.basis_spieler = copy.deepcopy(spieler)
+        st.session_state.basis_zeit = ergebnis.update_time
+        return True, rebased, konflikte
+
+    raise RuntimeError("Zu viele gleichzeitige Änderungen – bitte erneut versuchen.")
+
 # Spiel laden oder neues starten
 st.set_page_config(page_title="Vatertagsspiele", layout="wide")
+
+# 🩺 Metrik-Server / cProfile (opt-in)
+profiler = starte_diagnose()
 st.title("Vatertagsspiele")
 
 if "spiel_started" not in st.session_state:
@@ -31,8 +187,9 @@ if "spielname" not in st.session_state:
 if not st.session_state.spiel_started:
     st.subheader("Spielname eingeben oder auswählen")
 
-    spiele_docs = db.collection("spiele").stream()
-    spielnamen = sorted([doc.id for doc in spiele_docs])
+    with messe("firestore.stream"):
+        spiele_docs = db.collection("spiele").stream(**LESEN)
+        spielnamen = sorted([doc.id for doc in spiele_docs])
     optionen = ["Neues Spiel erstellen"] + spielnamen
     auswahl = st.selectbox("Spiel auswählen", optionen)
 
@@ -58,17 +215,49 @@ if not st.session_state.spiel_started:
 
             if st.button("Spiel endgültig löschen") and st.session_state.get("loeschbestaetigung"):
                 try:
-                    db.collection("spiele").document(st.session_state.loeschkandidat).delete()
+                    with messe("firestore.delete"):
+                        db.collection("spiele").document(st.session_state.loeschkandidat).delete(**SCHREIBEN)
+                    with messe("firestore.zusammenfassung"):
+                        aktualisiere_zusammenfassung(db, st.session_state.loeschkandidat, None)
                     st.success(f"Spiel '{st.session_state.loeschkandidat}' wurde gelöscht.")
                     st.session_state.spielname = None
                     st.session_state.spiel_started = False
                     if "loeschbestaetigung" in st.session_state:
                         del st.session_state["loeschbestaetigung"]
                     del st.session_state["loeschkandidat"]
-                    st.rerun()
+                    starte_neu()
                 except Exception as e:
                     st.error(f"Fehler beim Löschen: {e}")
 
+    # 📦 Export / Import (Parquet nur, wenn pyarrow installiert ist)
+    with st.expander("📦 Export / Import"):
+        formate = ["csv", "parquet"] if importlib.util.find_spec("pyarrow") else ["csv"]
+        format = st.radio("Format", formate, horizontal=True)
+        nur_auswahl = auswahl != "Neues Spiel erstellen" and st.checkbox(f"Nur '{auswahl}' exportieren", value=True)
+
+        if st.button("Export vorbereiten"):
+            export_df = exportiere(db, [auswahl] if nur_auswahl else None)
+            st.download_button(
+                "Export herunterladen",
+                als_bytes(export_df, format),
+                file_name=f"{auswahl if nur_auswahl else 'vatertagsspiele'}.{format}",
+            )
+
+        datei = st.file_uploader("Export importieren", type=["csv", "parquet"])
+        ueberschreiben = st.checkbox("Bestehende Spiele mit gleichem Namen überschreiben", value=False)
+        if ueberschreiben:
+            st.warning("⚠️ Spiele aus der Datei ersetzen gleichnamige Spiele samt aller Runden.")
+        if datei is not None and st.button("Import starten"):
+            try:
+                namen, uebersprungen = importiere(
+                    db, lese_datei(datei, "parquet" if datei.name.endswith(".parquet") else "csv"), ueberschreiben
+                )
+                st.success(f"{len(namen)} Spiele importiert: {', '.join(namen)}")
+                if uebersprungen:
+                    st.info(f"{len(uebersprungen)} bestehende Spiele übersprungen: {', '.join(uebersprungen)}")
+            except Exception as e:
+                st.error(f"Fehler beim Import: {e}")
+
     # ✅ Spiel laden oder neu erstellen
     if buttonLaden:
         if auswahl == "Neues Spiel erstellen":
@@ -77,22 +266,30 @@ if not st.session_state.spiel_started:
                 st.session_state.spieler = []
                 st.session_state.multiplikatoren = []
                 st.session_state.runden = []
+                st.session_state.basis_runden = []
+                st.session_state.basis_spieler = None
+                st.session_state.basis_zeit = None
             else:
                 st.warning("Bitte gib einen Spielnamen ein.")
-                st.stop()
+                stoppe()
         else:
-            spiel_doc = db.collection("spiele").document(st.session_state.spielname).get()
+            with messe("firestore.get"):
+                spiel_doc = db.collection("spiele").document(st.session_state.spielname).get(**LESEN)
             if spiel_doc.exists:
                 daten = spiel_doc.to_dict()
                 st.session_state.spieler = daten["spieler"]
                 st.session_state.multiplikatoren = daten["multiplikatoren"]
                 st.session_state.runden = daten["runden"]
+                # Basis für Optimistic Concurrency: Stand und Zeitpunkt des Ladens
+                st.session_state.basis_runden = copy.deepcopy(daten["runden"])
+                st.session_state.basis_spieler = copy.deepcopy(daten["spieler"])
+                st.session_state.basis_zeit = spiel_doc.update_time
             else:
                 st.error("Spiel nicht gefunden.")
-                st.stop()
+                stoppe()
 
         st.session_state.spiel_started = True
-        st.rerun()
+        starte_neu()
             
 # SPIEL SETUP
 if st.session_state.spiel_started and not st.session_state.spieler:
@@ -109,13 +306,17 @@ if st.session_state.spiel_started and not st.session_state.spieler:
         ]
         st.session_state.multiplikatoren = [float(x.strip()) for x in multiplikator_input.split(",") if x.strip()]
         st.session_state.runden = []
-        db.collection("spiele").document(st.session_state.spielname).set({
-            "spieler": st.session_state.spieler,
-            "multiplikatoren": st.session_state.multiplikatoren,
-            "runden": st.session_state.runden
-        })
+        with messe("firestore.set"):
+            ergebnis = db.collection("spiele").document(st.session_state.spielname).set({
+                "spieler": st.session_state.spieler,
+                "multiplikatoren": st.session_state.multiplikatoren,
+                "runden": st.session_state.runden
+            }, **SCHREIBEN)
+        st.session_state.basis_runden = []
+        st.session_state.basis_spieler = copy.deepcopy(st.session_state.spieler)
+        st.session_state.basis_zeit = ergebnis.update_time
         st.success("Spiel gespeichert.")
-        st.rerun()
+        starte_neu()
     
 # RUNDENVERWALTUNG
 if st.session_state.spiel_started and st.session_state.spieler:
@@ -123,16 +324,21 @@ if st.session_state.spiel_started and st.session_state.spieler:
     st.header("Rundenverwaltung")
     st.text(f"Spielname: {st.session_state.spielname} \nMultiplikatoren: {st.session_state.multiplikatoren}")
 
+    # Rückmeldung vom letzten Commit (nach Rebase)
+    if "commit_hinweis" in st.session_state:
+        hinweis, konflikte = st.session_state.pop("commit_hinweis")
+        st.info(hinweis)
+        if konflikte:
+            st.warning("Gleiche Felder wurden parallel geändert, deine Eingabe gilt:\n\n" + "\n".join(f"- {k}" for k in konflikte))
+
+    # Neue Runde wird beim nächsten Commit (unten) mitgespeichert
     if st.button("Neue Runde starten"):
         st.session_state.runden.append({
             "name": f"Runde {len(st.session_state.runden)+1}",
             "einsaetze": {},
             "plaetze": {}
         })
-        db.collection("spiele").document(st.session_state.spielname).update({
-            "runden": st.session_state.runden
-        })
-        st.rerun()
+        starte_neu()
 
     for i, runde in enumerate(st.session_state.runden):
         with st.expander(f"{runde['name']}", expanded=(i == len(st.session_state.runden) - 1)):
@@ -156,56 +362,29 @@ if st.session_state.spiel_started and st.session_state.spieler:
                 st.number_input(f"{sp['name']}: Platz", min_value=1, step=1, key=platz_key)
                 runde["plaetze"][sp["name"]] = st.session_state[platz_key]
 
-    ## Vor der Berechnung: Punktestand pro Spieler vor jeder Runde speichern
-    zwischenpunkte = {sp["name"]: 20.0 for sp in st.session_state.spieler}
-    bonus_empfaenger_pro_runde = []
-
-    # Leere die Einträge
-    for sp in st.session_state.spieler:
-        sp["einsaetze"], sp["plaetze"], sp["gewinne"] = [], [], []
-
-    # Berechnung pro Runde
-    for runde_idx, runde in enumerate(st.session_state.runden):
-        # Bestimme Bonus-Empfänger (ab Runde 2)
-        if runde_idx == 0:
-            bonus_empfaenger = []
-        else:
-            min_punkte = min(zwischenpunkte.values())
-            bonus_empfaenger = [name for name, punkte in zwischenpunkte.items() if punkte == min_punkte]
-        bonus_empfaenger_pro_runde.append(bonus_empfaenger)
-
-        # Bonus im Rundenobjekt speichern
-        st.session_state.runden[runde_idx]["bonus_empfaenger"] = bonus_empfaenger
-
-        # Berechne Gewinne
-        for sp in st.session_state.spieler:
-            name = sp["name"]
-            einsatz = runde["einsaetze"].get(name, 0)
-            platz = runde["plaetze"].get(name, 1)
-            multiplikator = st.session_state.multiplikatoren[platz - 1] if platz - 1 < len(st.session_state.multiplikatoren) else 0
-
-            gewinn = einsatz * multiplikator
-            if name in bonus_empfaenger and multiplikator < 0:
-                gewinn = 0  # Bonus für alle Letzten
+    berechnung_start = time.perf_counter()
 
-            sp["einsaetze"].append(einsatz)
-            sp["plaetze"].append(platz)
-            sp["gewinne"].append(float(gewinn))
+    # Eine Rangliste pro Sitzung: pro Rerun wird nur die bearbeitete oder neue Runde nachgerechnet
+    if "spielverlauf" not in st.session_state:
+        st.session_state.spielverlauf = Spielverlauf()
+    bonus_empfaenger_pro_runde, stand = berechne_spielstand(
+        st.session_state.spieler, st.session_state.runden, st.session_state.multiplikatoren,
+        st.session_state.spielverlauf
+    )
 
-        # Update Zwischenpunkte für nächste Runde
-        for sp in st.session_state.spieler:
-            zwischenpunkte[sp["name"]] += sp["gewinne"][-1]
-
-    # Aktualisiere Gesamtpunkte
-    for sp in st.session_state.spieler:
-        sp["punkte"] = 20.0 + sum(sp["gewinne"])
+    erfasse("punktestand", time.perf_counter() - berechnung_start)
 
     # Spielstand
     st.header("Spielstand")
     daten = []
     # Anzeige
-    for sp in sorted(st.session_state.spieler, key=lambda x: -x["punkte"]):
-        zeile = {"Spieler": sp["name"], "Punkte": round(sp["punkte"],1)}
+    for sp in stand:
+        zeile = {
+            "Platz": sp["rang"],
+            "Trend": sp["trend"],
+            "Spieler": sp["name"],
+            "Punkte": round(sp["punkte"],1),
+        }
         for i in range(len(st.session_state.runden) - 1, -1, -1):
             runde = st.session_state.runden[i]
             if i < len(sp["einsaetze"]):
@@ -219,35 +398,30 @@ if st.session_state.spiel_started and st.session_state.spieler:
         daten.append(zeile)
 
     df = pd.DataFrame(daten)
-    st.dataframe(df, use_container_width=True, hide_index=True)
+    with messe("arrow.tabelle"):
+        st.dataframe(df, use_container_width=True, hide_index=True)
     
-    # Spieler mit Bonus pro Runde ermitteln
-    bonus_empfaenger_pro_runde = []
-    punkte_zwischen_runden = [ {sp["name"]: 20.0} for sp in st.session_state.spieler ]  # Startpunkte
-
-    zwischenpunkte = {sp["name"]: 20.0 for sp in st.session_state.spieler}
-    for runde_idx, runde in enumerate(st.session_state.runden):
-        if runde_idx == 0:
-            # In der ersten Runde kein Bonus
-            bonus_empfaenger_pro_runde.append(None)
-        else:
-            min_punkte = min(zwischenpunkte.values())
-            letzte_spieler = [name for name, punkte in zwischenpunkte.items() if punkte == min_punkte]
-            bonus_empfaenger_pro_runde.append(letzte_spieler)
-
-        # Punktestand für nächste Runde aktualisieren
-        for sp in st.session_state.spieler:
-            zwischenpunkte[sp["name"]] += sp["gewinne"][runde_idx]
-
     # AUTOMATISCHES SPEICHERN
     if "spielname" in st.session_state:
         try:
-            spiel_daten = {
-                "spieler": st.session_state.spieler,
-                "multiplikatoren": st.session_state.multiplikatoren,
-                "runden": st.session_state.runden,
-                "zeitstempel": firestore.SERVER_TIMESTAMP
-            }
-            db.collection("spiele").document(st.session_state.spielname).set(spiel_daten)
+            gespeichert, rebased, konflikte = committe_runden(st.session_state.spielname)
+            if rebased:
+                # Eingabefelder mit dem zusammengeführten Stand neu aufbauen
+                for key in [k for k in st.session_state if k.startswith(("rundenname_", "einsatz_", "platz_"))]:
+                    del st.session_state[key]
+                st.session_state.commit_hinweis = ("🔀 Änderungen anderer Scorer wurden übernommen und deine Eingaben darauf gespeichert.", konflikte)
+                starte_neu()
+            if gespeichert:
+                st.caption(f"💾 Gespeichert um {time.strftime('%H:%M:%S')}")
+
+            # Saison-Zusammenfassung nur bei echter Änderung nachziehen
+            zusammenfassung = erstelle_zusammenfassung(st.session_state.spieler, st.session_state.runden)
+            if st.session_state.get("letzte_zusammenfassung") != (st.session_state.spielname, zusammenfassung):
+                with messe("firestore.zusammenfassung"):
+                    aktualisiere_zusammenfassung(db, st.session_state.spielname, zusammenfassung)
+                st.session_state.letzte_zusammenfassung = (st.session_state.spielname, zusammenfassung)
         except Exception as e:
-            st.error(f"Fehler beim Speichern: {e}")            
+            st.error(f"Fehler beim Speichern: {e}")
+
+# Versteckte Diagnoseseite (?diagnose=1, optional ?profil=1)
+zeige_diagnose(profiler)
@@ -2,38 +2,88 @@ import streamlit as st
 # Muss als erstes Streamlit-Kommando stehen!
 st.set_page_config(page_title="Spielstand ansehen", layout="wide")
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-import json
 import pandas as pd
 from streamlit_autorefresh import st_autorefresh
 import altair as alt
-
-# 🔄 Auto-Refresh alle 15 Sekunden
-st_autorefresh(interval=15000, key="refresh_viewer")
+import streamlit.components.v1 as components
+from firestore_client import get_firestore_client, LESEN
+from verlauf_chart import verlauf_daten, verlauf_chart
+from aktualisierung import Taktgeber, MAX_MS, SCHNELL_MS, zeitfenster, spielversion
+from hintergrund_lader import HintergrundLader
+from geteilter_cache import geteilt
+from messung import messe
+from kiosk import rendere_kiosk
+from rangliste import Spielverlauf
 
 # 🔒 Fester Spielname – HIER ANPASSEN!
 FESTER_SPIELNAME = "Wintervatertagsspiele2025"
 
-# Firestore initialisieren (einmalig)
-def get_firestore_client():
-    if not firebase_admin._apps:
-        cred_dict = json.loads(st.secrets["firebase_service_account"])
-        cred = credentials.Certificate(cred_dict)
-        firebase_admin.initialize_app(cred)
-    return firestore.client()
+# Ab so vielen Runden wird das skalierbare Verlaufsdiagramm verwendet
+SKALIERBAR_AB_RUNDEN = 30
+
+# 📺 Kiosk-Modus (?kiosk=1): vorgerenderte Ansichten, die im Browser rotieren
+KIOSK = st.query_params.get("kiosk") == "1"
+KIOSK_HOEHE = 1000
+
+# So oft (Sekunden) prüft eine Sitzung, ob ihr Hintergrund-Refresh fertig ist – nur solange einer läuft
+LADER_PRUEFUNG_S = 2
 
+# Firestore initialisieren (einmalig pro Prozess)
 db = get_firestore_client()
 
-st.header("🎲 Vatertagsspiele 2025 - LIVE")
+if not KIOSK:
+    st.header("🎲 Vatertagsspiele 2025 - LIVE")
+
+# Spieldaten aus Firebase laden (über get_spiel_lader GECACHT!)
+@geteilt(ttl=300)  # Über alle Replikas geteilt: nur eine liest Firestore
+def lade_spieldaten(spielname, fenster):
+    """
+    Lädt Spieldaten aus Firebase.
+
+    Args:
+        spielname: Name des Spiels
+        fenster: Abfragefenster – höchstens ein Firestore-Zugriff pro Fenster
+
+    Returns:
+        dict: Spieldaten oder None, wenn das Spiel nicht existiert
+    """
+    with messe("firestore.get"):
+        spiel_doc = db.collection("spiele").document(spielname).get(**LESEN)
+    if not spiel_doc.exists:
+        return None
+    return spiel_doc.to_dict()
+
+# Stale-while-revalidate (GECACHT - ein Lader pro Prozess): Lesezugriffe wachsen nicht mit der Zahl der Bildschirme
+@st.cache_resource
+def get_spiel_lader():
+    """Liefert sofort den letzten guten Stand und lädt ihn bei Bedarf im Hintergrund neu."""
+    return HintergrundLader(lambda spielname: lade_spieldaten(spielname, zeitfenster()), weich_ttl=SCHNELL_MS / 1000)
 
 # Spiel laden
-spiel_doc = db.collection("spiele").document(FESTER_SPIELNAME).get()
-if not spiel_doc.exists:
+daten, frische = get_spiel_lader().hole(FESTER_SPIELNAME)
+if frische["fehler"] and not KIOSK:
+    st.warning(f"⚠️ Verbindung gestört – Stand von vor {frische['alter_s']:.0f} s ({frische['fehler']})")
+
+# 🔄 Läuft gerade ein Hintergrund-Refresh, einmal neu zeichnen, sobald er fertig ist (prüft nur den Speicher)
+if frische["laedt"]:
+    @st.fragment(run_every=LADER_PRUEFUNG_S)
+    def beobachte_lader():
+        if not get_spiel_lader().laedt(FESTER_SPIELNAME):
+            st.rerun()
+
+    beobachte_lader()
+
+if not daten:
     st.error(f"Spiel '{FESTER_SPIELNAME}' nicht gefunden.")
+    st_autorefresh(interval=MAX_MS, key="refresh_viewer")
     st.stop()
-    
-daten = spiel_doc.to_dict()
+
+# 🔄 Auto-Refresh passt sich der Aktivität an: schnell nach Änderungen, im Leerlauf immer seltener
+if "taktgeber" not in st.session_state:
+    st.session_state.taktgeber = Taktgeber()
+st.session_state.taktgeber.beobachte(spielversion(daten))
+st_autorefresh(interval=st.session_state.taktgeber.intervall(daten.get("aktualisierung_ms")), key="refresh_viewer")
+
 spieler = daten.get("spieler", [])
 multiplikatoren = daten.get("multiplikatoren", [])
 runden = daten.get("runden", [])
@@ -42,27 +92,43 @@ if not spieler or not runden:
     st.info("Spiel hat keine Spieler oder Runden.")
     st.stop()
 
-st.subheader("📊 Spielstand")
-# Punkte summieren (nur zur Anzeige)
-for sp in spieler:
-    if "gewinne" not in sp:
-        sp["gewinne"] = []
-    if "einsaetze" not in sp:
-        sp["einsaetze"] = []
-    if "plaetze" not in sp:
-        sp["plaetze"] = []
+# Rangliste über Reruns hinweg (GECACHT - ein Verlauf pro Spiel und Prozess)
+@st.cache_resource
+def get_spielverlauf(spielname):
+    """Spielverlauf, der pro Spielversion nur neue oder geänderte Runden nachrechnet."""
+    return Spielverlauf()
 
-    sp["punkte"] = 20.0 + sum(sp["gewinne"])
+# Punkte, Plätze und Bonus nach derselben Wertung wie Eingabe- und Zuschauer-App
+spielverlauf = get_spielverlauf(FESTER_SPIELNAME)
+spieler, bonus_empfaenger_pro_runde = spielverlauf.aktualisiere(
+    spielversion(daten), [sp["name"] for sp in spieler], runden, multiplikatoren
+)
 
-# Bonus extrahieren aus gespeicherten Runden
-bonus_empfaenger_pro_runde = []
-for r in runden:
-    bonus_empfaenger_pro_runde.append(r.get("bonus_empfaenger", []))
+# 🚀 Kiosk-Seite nur einmal pro Spielversion rendern (GECACHT!)
+@st.cache_data(max_entries=4)
+def kiosk_seite(version, _spieler, _runden, _bonus):
+    """
+    Rendert alle Ansichten als statische HTML/SVG-Seite. Der Cache-Schlüssel ist
+    nur die Spielversion – das Spieldokument selbst wird nicht gehasht.
+
+    Returns:
+        str: HTML-Dokument für components.html
+    """
+    return rendere_kiosk(_spieler, _runden, _bonus)
+
+if KIOSK:
+    # Gleiches HTML → Streamlit lässt das iframe stehen, die Rotation läuft ungestört weiter
+    components.html(
+        kiosk_seite(spielversion(daten), spieler, runden, bonus_empfaenger_pro_runde), height=KIOSK_HOEHE
+    )
+    st.stop()
 
-# Tabelle bauen
+st.subheader("📊 Spielstand")
+
+# Tabelle bauen (Spieler kommen bereits in Ranglistenreihenfolge)
 daten = []
-for sp in sorted(spieler, key=lambda x: -x["punkte"]):
-    zeile = {"Spieler": sp["name"], "Punkte": round(sp["punkte"], 1)}
+for sp in spieler:
+    zeile = {"Platz": sp["rang"], "Trend": sp["trend"], "Spieler": sp["name"], "Punkte": round(sp["punkte"], 1)}
     for i in range(len(runden) - 1, -1, -1):
         runde = runden[i]
         if i < len(sp["einsaetze"]):
@@ -80,41 +146,47 @@ st.dataframe(df, use_container_width=True, hide_index=True)
 # Punkteverlauf für Linechart vorbereiten
 st.subheader("📈 Punkteverlauf")
 
-punkte_daten = []
 runden_namen = [r["name"] for r in runden]
-runden_index = {name: idx for idx, name in enumerate(runden_namen)}
 
-for sp in spieler:
-    kumuliert = 20.0
-    for i, runde in enumerate(runden):
-        if i < len(sp["gewinne"]):
-            kumuliert += sp["gewinne"][i]
-            punkte_daten.append({
-                "Spieler": sp["name"],
-                "Runde": runde["name"],
-                "RundenIndex": i,
-                "Punkte": round(kumuliert, 1)
-            })
-
-punkte_df = pd.DataFrame(punkte_daten)
-
-# Sortieren und kategorisieren
-punkte_df["Runde"] = pd.Categorical(punkte_df["Runde"], categories=runden_namen, ordered=True)
-punkte_df = punkte_df.sort_values("RundenIndex")
-
-# Min/Max für Y-Achse
-min_punkte = punkte_df["Punkte"].min()
-max_punkte = punkte_df["Punkte"].max()
-
-# Linechart mit Y-Skala begrenzt
-chart = alt.Chart(punkte_df).mark_line(point=True).encode(
-    x=alt.X("Runde:N", title="Runde", sort=runden_namen),
-    y=alt.Y("Punkte:Q", title="Punkte", scale=alt.Scale(domain=[min_punkte, max_punkte])),
-    color=alt.Color("Spieler:N", legend=alt.Legend(orient="bottom")),
-    tooltip=["Spieler", "Runde", "Punkte"]
-).properties(
-    height=400
-)
+if len(runden) >= SKALIERBAR_AB_RUNDEN:
+    # Viele Runden: quantitative Achse, LTTB-Downsampling und feste Domains
+    punkte_df, domains = verlauf_daten(spieler, runden_namen)
+    chart = verlauf_chart(punkte_df, domains)
+else:
+    punkte_daten = []
+    runden_index = {name: idx for idx, name in enumerate(runden_namen)}
+
+    for sp in spieler:
+        kumuliert = 20.0
+        for i, runde in enumerate(runden):
+            if i < len(sp["gewinne"]):
+                kumuliert += sp["gewinne"][i]
+                punkte_daten.append({
+                    "Spieler": sp["name"],
+                    "Runde": runde["name"],
+                    "RundenIndex": i,
+                    "Punkte": round(kumuliert, 1)
+                })
+
+    punkte_df = pd.DataFrame(punkte_daten)
+
+    # Sortieren und kategorisieren
+    punkte_df["Runde"] = pd.Categorical(punkte_df["Runde"], categories=runden_namen, ordered=True)
+    punkte_df = punkte_df.sort_values("RundenIndex")
+
+    # Min/Max für Y-Achse
+    min_punkte = punkte_df["Punkte"].min()
+    max_punkte = punkte_df["Punkte"].max()
+
+    # Linechart mit Y-Skala begrenzt
+    chart = alt.Chart(punkte_df).mark_line(point=True).encode(
+        x=alt.X("Runde:N", title="Runde", sort=runden_namen),
+        y=alt.Y("Punkte:Q", title="Punkte", scale=alt.Scale(domain=[min_punkte, max_punkte])),
+        color=alt.Color("Spieler:N", legend=alt.Legend(orient="bottom")),
+        tooltip=["Spieler", "Runde", "Punkte"]
+    ).properties(
+        height=400
+    )
 
 st.altair_chart(chart, use_container_width=True)
 
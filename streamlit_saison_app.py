@@ -0,0 +1,73 @@
+import streamlit as st
+# Muss als erstes Streamlit-Kommando stehen!
+st.set_page_config(page_title="Vatertags-Ruhmeshalle", layout="wide")
+
+import pandas as pd
+from firestore_client import get_firestore_client, LESEN
+from saison import REKORDE_DOKUMENT
+
+# Firebase verbinden (prozessweit geteilter Client)
+db = get_firestore_client()
+
+# 🚀 Bestenliste laden – ein kleines Dokument statt alle Spiele nachzuspielen
+@st.cache_data(ttl=300)
+def lade_rekorde():
+    """
+    Lädt die inkrementell gepflegte Bestenliste aller Spiele.
+
+    Returns:
+        dict: Kennzahlen pro Spieler (leer, wenn noch nichts zusammengefasst wurde)
+    """
+    doc = db.collection(REKORDE_DOKUMENT[0]).document(REKORDE_DOKUMENT[1]).get(**LESEN)
+    if not doc.exists:
+        return {}
+    return doc.to_dict().get("spieler", {})
+
+
+st.title("🏛️ Ruhmeshalle der Vatertagsspiele")
+
+rekorde = lade_rekorde()
+if not rekorde:
+    st.info("Noch keine Zusammenfassungen vorhanden. Backfill mit `python saison.py --credentials <datei>` starten.")
+    st.stop()
+
+df = pd.DataFrame([
+    {
+        "Spieler": name,
+        "Spiele": int(werte.get("spiele", 0)),
+        "Siege": int(werte.get("siege", 0)),
+        "Rundensiege": int(werte.get("rundensiege", 0)),
+        "Bonus": int(werte.get("bonus", 0)),
+        "Effizienz": werte.get("gewinn", 0) / werte["einsatz"] if werte.get("einsatz") else 0.0,
+        "Höchster Punktestand": round(werte.get("max_punkte", 20.0), 1),
+    }
+    for name, werte in rekorde.items()
+]).sort_values(["Siege", "Rundensiege"], ascending=False)
+
+def rekordhalter(spalte):
+    zeile = df.loc[df[spalte].idxmax()]
+    return zeile["Spieler"], zeile[spalte]
+
+# Ewige Rekorde
+st.subheader("🏆 Ewige Rekorde")
+col1, col2, col3, col4, col5 = st.columns(5)
+with col1:
+    name, wert = rekordhalter("Siege")
+    st.metric("👑 Meiste Spielsiege", name, f"{wert}×")
+with col2:
+    name, wert = rekordhalter("Rundensiege")
+    st.metric("🏆 Meiste Rundensiege", name, f"{wert}×")
+with col3:
+    name, wert = rekordhalter("Effizienz")
+    st.metric("📈 Beste Effizienz", name, f"{wert:.2f} Gewinn/Einsatz")
+with col4:
+    name, wert = rekordhalter("Bonus")
+    st.metric("🎁 Meiste Rubber-Banding-Boni", name, f"{wert}×")
+with col5:
+    name, wert = rekordhalter("Höchster Punktestand")
+    st.metric("💯 Höchster Punktestand ever", name, f"{wert:.1f}")
+
+# Alle Spieler
+st.subheader("📊 Ewige Tabelle")
+df["Effizienz"] = df["Effizienz"].round(2)
+st.dataframe(df, use_container_width=True, hide_index=True)
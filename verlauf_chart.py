@@ -0,0 +1,96 @@
+import altair as alt
+import numpy as np
+import pandas as pd
+
+# Höchstens so viele Punkte pro Spieler werden an Vega-Lite geschickt
+PUNKTE_BUDGET = 150
+# Bis zu dieser Gesamtzahl werden Punktmarker gezeichnet
+MARKER_GRENZE = 400
+
+
+def lttb(x, y, schwelle):
+    """
+    Largest-Triangle-Three-Buckets: wählt schwelle Punkte aus, die die Form
+    der Kurve möglichst gut erhalten (erster und letzter Punkt bleiben immer).
+
+    Returns:
+        np.ndarray: Indizes der behaltenen Punkte
+    """
+    n = len(x)
+    if schwelle >= n or schwelle < 3:
+        return np.arange(n)
+
+    behalten = np.empty(schwelle, dtype=int)
+    behalten[0], behalten[-1] = 0, n - 1
+    kanten = np.linspace(1, n - 1, schwelle - 1).astype(int)
+
+    a = 0
+    for i in range(schwelle - 2):
+        start, ende = kanten[i], kanten[i + 1]
+        if i + 2 < len(kanten):
+            naechst = slice(kanten[i + 1], kanten[i + 2])
+            mittel_x, mittel_y = x[naechst].mean(), y[naechst].mean()
+        else:
+            mittel_x, mittel_y = x[-1], y[-1]
+
+        flaeche = np.abs(
+            (x[a] - mittel_x) * (y[start:ende] - y[a]) - (x[a] - x[start:ende]) * (mittel_y - y[a])
+        )
+        a = start + int(flaeche.argmax())
+        behalten[i + 1] = a
+    return behalten
+
+
+def verlauf_daten(spieler_liste, runden_namen, budget=PUNKTE_BUDGET, top_n=None):
+    """
+    Baut die Daten für das skalierbare Verlaufsdiagramm.
+
+    Args:
+        spieler_liste: Spieler mit "name" und "gewinne"
+        runden_namen: Namen der Runden (für Tooltips)
+        budget: Maximale Punkte pro Spieler (LTTB-Downsampling darüber)
+        top_n: Nur die besten N Spieler nach aktuellem Stand (None = alle)
+
+    Returns:
+        tuple: (DataFrame mit RundenIndex/Runde/Spieler/Punkte, Domains als dict)
+    """
+    verlaeufe = {
+        sp["name"]: 20.0 + np.concatenate([[0.0], np.cumsum(sp["gewinne"], dtype=float)])
+        for sp in spieler_liste
+    }
+    if top_n:
+        beste = sorted(verlaeufe, key=lambda name: -verlaeufe[name][-1])[:top_n]
+        verlaeufe = {name: verlaeufe[name] for name in beste}
+
+    beschriftung = np.array(["Start"] + list(runden_namen), dtype=object)
+    teile = []
+    for name, punkte in verlaeufe.items():
+        index = np.arange(len(punkte))
+        behalten = lttb(index.astype(float), punkte, budget)
+        teile.append(pd.DataFrame({
+            "RundenIndex": index[behalten],
+            "Runde": beschriftung[np.minimum(behalten, len(beschriftung) - 1)],
+            "Spieler": name,
+            "Punkte": np.round(punkte[behalten], 1),
+        }))
+
+    df = pd.concat(teile, ignore_index=True) if teile else pd.DataFrame(columns=["RundenIndex", "Runde", "Spieler", "Punkte"])
+
+    # Domains aus den vollständigen Daten – Downsampling darf die Achsen nicht verschieben
+    alle = np.concatenate(list(verlaeufe.values())) if verlaeufe else np.array([20.0])
+    domains = {
+        "x": [0, max(len(runden_namen), 1)],
+        "y": [float(np.floor(alle.min())), float(np.ceil(alle.max()))],
+    }
+    return df, domains
+
+
+def verlauf_chart(df, domains, hoehe=400):
+    """Linienchart mit quantitativer Rundenachse und festen Domains."""
+    return alt.Chart(df).mark_line(point=len(df) <= MARKER_GRENZE).encode(
+        x=alt.X("RundenIndex:Q", title="Runde", scale=alt.Scale(domain=domains["x"], nice=False),
+                axis=alt.Axis(tickMinStep=1, format="d")),
+        y=alt.Y("Punkte:Q", title="Punkte", scale=alt.Scale(domain=domains["y"])),
+        color=alt.Color("Spieler:N", legend=alt.Legend(orient="bottom")),
+        tooltip=["Spieler", "Runde", "Punkte"]
+    ).properties(height=hoehe)